@@ -1,135 +1,169 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
 from sqlalchemy.future import select
+import html
 import urllib.parse
-from markdown import markdown
-from datetime import datetime
 
-from ..core.database import get_db
+from ..core.config import settings
+from ..core.database import get_read_db
+from ..core.http_cache import CachedPage, is_not_modified, not_modified_response, page_response
+from ..core.singleflight import Broadcast
 from ..services.ai_service import AIService
+from ..services.blog_service import BlogService, format_cursor, parse_cursor
+from ..services.render_service import (
+    RenderService, blog_etag, render_category_page, render_home_page, render_markdown, render_search_page
+)
+from ..services.search_service import search_index
+from ..services.topic_service import topic_index
 from models import Blog
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 ai_service = AIService()
+blog_service = BlogService(ai_service)
+render_service = RenderService(templates.env)
+blog_service.on_created.append(render_service.invalidate_listings)
+blog_service.on_created.append(search_index.add_blog)
+blog_service.on_created.append(topic_index.add_blog)
 
 @router.get("/", response_class=HTMLResponse)
-async def blogs_home(request: Request, query: str = None, db: AsyncSession = Depends(get_db)):
+async def blogs_home(request: Request, query: str = None, db: AsyncSession = Depends(get_read_db)):
     if query:
-        return RedirectResponse(url=f"/blog/post/{urllib.parse.quote(query)}")
+        # Search existing posts first; generating a new one is an explicit choice on the results page
+        return RedirectResponse(url=f"/blog/search?q={urllib.parse.quote(query)}")
     
-    # Get blogs grouped by category
-    categories_result = await db.execute(
-        select(Blog.category, func.count(Blog.id).label('count'))
-        .where(Blog.category.isnot(None))
-        .group_by(Blog.category)
-        .order_by(func.count(Blog.id).desc())
-    )
-    categories = categories_result.all()
-    
-    blogs_by_category = {}
-    for category, count in categories:
-        blogs_result = await db.execute(
-            select(Blog)
-            .where(Blog.category == category)
-            .order_by(Blog.created_at.desc())
-            .limit(3)
-        )
-        blogs_by_category[category] = {
-            'blogs': blogs_result.scalars().all(),
-            'total': count
-        }
-    
-    return templates.TemplateResponse("blogs.html", {
-        "request": request,
-        "blogs_by_category": blogs_by_category,
-        "datetime": datetime
-    })
+    page = render_service.cached_listing("home")
+    if page is not None:
+        return page_response(request, page, settings.LISTING_CACHE_TTL)
+    version = render_service.listing_version()
+
+    blogs_by_category = await blog_service.home_listing(db)
+    page = CachedPage(render_home_page(templates.env, blogs_by_category))
+    render_service.store_listing("home", page, version)
+    return page_response(request, page, settings.LISTING_CACHE_TTL)
+
+@router.get("/search", response_class=HTMLResponse)
+async def search_blogs(request: Request, q: str = "", limit: int = 20):
+    q = q.strip()
+    results = []
+    if q:
+        await search_index.ensure_fresh()
+        results = [doc for doc, score in search_index.search(q, min(max(limit, 1), 100))]
+    return HTMLResponse(render_search_page(templates.env, q, results))
 
 @router.get("/post/{query:path}", response_class=HTMLResponse)
-async def individual_blog(request: Request, query: str, db: AsyncSession = Depends(get_db)):
+async def individual_blog(request: Request, query: str, db: AsyncSession = Depends(get_read_db)):
     topic = urllib.parse.unquote(query)
+    key = BlogService.topic_key(topic)
+
+    # Posts never change once generated, so a cached page needs no DB or rendering
+    page = render_service.cached_page(key)
+    if page is not None:
+        return page_response(request, page, settings.POST_CACHE_MAX_AGE)
     
-    # Check if blog exists
-    result = await db.execute(select(Blog).where(Blog.query == topic.lower()))
+    # Check if blog exists. A replica that hasn't caught up yet is harmless: generation
+    # re-checks the primary before calling the LLM.
+    result = await db.execute(select(Blog).where(Blog.query == key))
     blog = result.scalar_one_or_none()
 
     if blog:
-        return templates.TemplateResponse("blog.html", {
-            "request": request,
-            "content": markdown(blog.content),
-            "error": None,
-            "title": blog.title
-        })
+        etag = blog_etag(blog)
+        if is_not_modified(request, etag, blog.created_at):
+            return not_modified_response(etag, blog.created_at, settings.POST_CACHE_MAX_AGE)
+        if blog.html is None:
+            # Backfill rows created before HTML was stored; the write goes to the primary
+            blog.html = render_markdown(blog.content)
+            await blog_service.store_html(blog)
+        return page_response(request, render_service.blog_page(key, blog), settings.POST_CACHE_MAX_AGE)
+
+    # Don't hold a pooled connection while waiting on the LLM
+    await db.close()
+
+    # Reworded or misspelled versions of an existing topic reuse that post
+    await topic_index.ensure_fresh()
+    existing = topic_index.match(topic)
+    if existing is not None and existing != key:
+        return RedirectResponse(url=f"/blog/post/{urllib.parse.quote(existing)}")
 
-    # Generate new blog
-    category, title, content = await ai_service.generate_blog_with_category(topic)
+    if settings.BLOG_STREAMING:
+        return StreamingResponse(
+            stream_blog_page(topic, key, blog_service.stream(topic)),
+            media_type="text/html",
+            headers={"X-Accel-Buffering": "no"}
+        )
+
+    # Generate new blog (concurrent requests for the same topic share one generation)
+    blog, error = await blog_service.get_or_generate(topic)
     
-    if content.startswith("⚠️"):
+    if error:
         return templates.TemplateResponse("blog.html", {
             "request": request,
             "content": "",
-            "error": content,
+            "error": error,
             "title": topic.title()
         })
 
-    # Save to database
-    blog = Blog(query=topic.lower(), title=title, content=content, category=category)
-    db.add(blog)
-    await db.commit()
+    return page_response(request, render_service.blog_page(key, blog), settings.POST_CACHE_MAX_AGE)
+
+STREAM_MARKER = "<!--blog-stream-->"
 
-    return templates.TemplateResponse("blog.html", {
-        "request": request,
-        "content": markdown(content),
-        "error": None,
-        "title": title
-    })
+async def stream_blog_page(topic: str, key: str, broadcast: Broadcast):
+    """Send the page shell at once, then the raw article as it is generated.
+
+    When generation finishes the rendered HTML is appended and a style rule hides
+    the raw stream, so the swap needs no JavaScript.
+    """
+    shell = templates.get_template("blog.html").render(content=STREAM_MARKER, error=None, title=topic.title())
+    head, tail = shell.split(STREAM_MARKER, 1)
+    yield head + '<div id="blog-stream" style="white-space: pre-wrap">'
+    async for chunk in broadcast.subscribe():
+        yield html.escape(chunk)
+    yield '</div>'
+
+    blog = broadcast.result
+    if blog is not None:
+        render_service.blog_page(key, blog)
+        article = blog.html if blog.html is not None else render_markdown(blog.content)
+        yield '<style>#blog-stream { display: none; }</style>' + article
+    else:
+        yield f'<p class="error">{html.escape(broadcast.error or "")}</p>'
+    yield tail
 
 @router.get("/category/{category}", response_class=HTMLResponse)
-async def category_blogs(request: Request, category: str, page: int = 1, db: AsyncSession = Depends(get_db)):
+async def category_blogs(request: Request, category: str, page: int = 1, after: str = None, db: AsyncSession = Depends(get_read_db)):
     if page < 1:
         page = 1
         
     blogs_per_page = 12
-    offset = (page - 1) * blogs_per_page
     
-    # Get total count
-    total_result = await db.execute(
-        select(func.count(Blog.id)).where(Blog.category == category)
-    )
-    total = total_result.scalar() or 0
+    cache_key = f"category:{category}:{page}:{after or ''}"
+    cached = render_service.cached_listing(cache_key)
+    if cached is not None:
+        return page_response(request, cached, settings.LISTING_CACHE_TTL)
+    version = render_service.listing_version()
     
-    if total == 0:
-        return templates.TemplateResponse("category_blogs.html", {
-            "request": request,
-            "blogs": [],
-            "category": category,
-            "current_page": 1,
-            "total_pages": 1
-        })
+    total = await blog_service.category_count(db, category)
     
-    # Get paginated blogs
-    blogs_result = await db.execute(
-        select(Blog)
-        .where(Blog.category == category)
-        .order_by(Blog.created_at.desc())
-        .offset(offset)
-        .limit(blogs_per_page)
-    )
-    blogs = blogs_result.scalars().all()
+    if total == 0:
+        return HTMLResponse(render_category_page(templates.env, category, [], 1, 1, None))
     
     total_pages = max(1, (total + blogs_per_page - 1) // blogs_per_page)
     
     if page > total_pages:
         return RedirectResponse(url=f"/blog/category/{category}?page={total_pages}")
     
-    return templates.TemplateResponse("category_blogs.html", {
-        "request": request,
-        "blogs": blogs,
-        "category": category,
-        "current_page": page,
-        "total_pages": total_pages
-    })
\ No newline at end of file
+    # Keyset pagination: plain page-number links are resolved to a cursor first
+    cursor = parse_cursor(after) if after else None
+    if cursor is None:
+        cursor = await blog_service.page_cursor(db, category, page, blogs_per_page)
+    blogs = await blog_service.category_page(db, category, cursor, blogs_per_page)
+    
+    next_cursor = None
+    if blogs and page < total_pages:
+        next_cursor = format_cursor(blogs[-1].created_at, blogs[-1].id)
+    
+    page_html = CachedPage(render_category_page(templates.env, category, blogs, page, total_pages, next_cursor))
+    render_service.store_listing(cache_key, page_html, version)
+    return page_response(request, page_html, settings.LISTING_CACHE_TTL)
@@ -1,57 +1,23 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-import httpx
 import logging
 
-from ..core.database import get_db
+from ..core.config import settings
+from ..core.database import get_db, SessionLocal
+from ..core.work_queue import WorkQueue
 from ..services.ai_service import AIService
+from ..services.bot_service import BotService
 from ..services.image_service import ImageService
-from models import BotConfig
+from ..services.telegram_sender import telegram_sender
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 ai_service = AIService()
 image_service = ImageService()
+bot_service = BotService()
 
-async def send_api_request(token: str, method: str, payload: dict):
-    url = f"https://api.telegram.org/bot{token}/{method}"
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            return True
-    except httpx.HTTPError as e:
-        logger.error(f"Telegram API Error: {e}")
-        return False
-
-@router.post("/{bot_name}")
-async def telegram_webhook(bot_name: str, request: Request, db: AsyncSession = Depends(get_db)):
-    query_params = dict(request.query_params)
-    token_from_query = query_params.get("token")
-
-    if token_from_query:
-        # Upsert bot token
-        result = await db.execute(select(BotConfig).where(BotConfig.name == bot_name))
-        bot = result.scalars().first()
-        if bot:
-            bot.token = token_from_query
-        else:
-            bot = BotConfig(name=bot_name, token=token_from_query)
-            db.add(bot)
-        await db.commit()
-
-    # Get bot token
-    result = await db.execute(select(BotConfig).where(BotConfig.name == bot_name))
-    bot = result.scalars().first()
-    if not bot:
-        raise HTTPException(status_code=404, detail="Bot token not found")
-
-    update = await request.json()
-    message = update.get("message")
-    if not message:
-        return {"ok": True}
-
+async def process_update(item: tuple):
+    token, message = item
     chat_id = message["chat"]["id"]
 
     if "text" in message:
@@ -61,35 +27,66 @@ async def telegram_webhook(bot_name: str, request: Request, db: AsyncSession = D
         if user_input.startswith('.'):
             # Generate image
             prompt = user_input[1:]
-            image_url = await image_service.generate_image(prompt, user_name, chat_id, db)
+            async with SessionLocal() as db:
+                image = await image_service.generate_image(prompt, user_name, chat_id, db)
             
-            if image_url:
-                await send_api_request(bot.token, "sendPhoto", {
-                    "chat_id": chat_id,
-                    "photo": image_url,
-                    "caption": "Here is your generated image"
-                })
+            if image:
+                image_url, image_path = image
+                # Uploads the stored copy when there is one; the upstream link may have expired
+                telegram_sender.send_photo(token, chat_id, "Here is your generated image",
+                                           url=image_url, path=image_path)
             else:
-                await send_api_request(bot.token, "sendMessage", {
-                    "chat_id": chat_id,
-                    "text": "⚠️ Failed to generate image. Please try again later."
-                })
+                telegram_sender.send_message(token, chat_id, "⚠️ Failed to generate image. Please try again later.")
         else:
             # Generate text response
             try:
                 gpt_reply = await ai_service.generate_response(user_input)
                 sanitized_text = gpt_reply.replace('<', '&lt;').replace('>', '&gt;').replace('`', "'")
-                success = await send_api_request(bot.token, "sendMessage", {
-                    "chat_id": chat_id,
-                    "text": sanitized_text
-                })
-                if not success:
-                    logger.error(f"Failed to send message to chat {chat_id}")
+                if not telegram_sender.send_message(token, chat_id, sanitized_text):
+                    logger.error(f"Failed to queue reply to chat {chat_id}")
             except Exception as e:
                 logger.error(f"Error processing message: {e}")
-                await send_api_request(bot.token, "sendMessage", {
-                    "chat_id": chat_id,
-                    "text": "⚠️ Sorry, I encountered an error. Please try again."
-                })
+                telegram_sender.send_message(token, chat_id, "⚠️ Sorry, I encountered an error. Please try again.")
+
+update_queue = WorkQueue(
+    "telegram-updates",
+    process_update,
+    maxsize=settings.WEBHOOK_QUEUE_SIZE,
+    workers=settings.WEBHOOK_WORKERS,
+    dedup_window=settings.WEBHOOK_DEDUP_WINDOW,
+)
+
+@router.post("/{bot_name}")
+async def telegram_webhook(bot_name: str, request: Request, db: AsyncSession = Depends(get_db)):
+    query_params = dict(request.query_params)
+    token_from_query = query_params.get("token")
+
+    if token_from_query:
+        # Upsert bot token (a no-op when it matches the cached one)
+        await bot_service.upsert_token(db, bot_name, token_from_query)
+
+    # Get bot token
+    token = await bot_service.get_token(db, bot_name)
+    if not token:
+        raise HTTPException(status_code=404, detail="Bot token not found")
+
+    try:
+        update = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid update payload")
+    if not isinstance(update, dict):
+        raise HTTPException(status_code=400, detail="Invalid update payload")
+
+    message = update.get("message")
+    if not message or "chat" not in message:
+        return {"ok": True}
+
+    # Acknowledge right away; replies are produced by the worker pool. Telegram
+    # redelivers slow or failed webhooks, so repeated update_ids are dropped.
+    update_id = update.get("update_id")
+    dedup_key = (bot_name, update_id) if update_id is not None else None
+    if not update_queue.submit((token, message), dedup_key=dedup_key):
+        # Non-2xx makes Telegram retry later instead of losing the update
+        raise HTTPException(status_code=503, detail="Update queue is full")
 
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
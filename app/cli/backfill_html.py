@@ -0,0 +1,22 @@
+from sqlalchemy.future import select
+
+from ..core.database import SessionLocal
+from ..services.render_service import render_markdown
+from models import Blog
+
+async def run(args):
+    total = 0
+    async with SessionLocal() as db:
+        while True:
+            result = await db.execute(
+                select(Blog).where(Blog.html.is_(None)).order_by(Blog.id).limit(args.batch_size)
+            )
+            blogs = result.scalars().all()
+            if not blogs:
+                break
+            for blog in blogs:
+                blog.html = render_markdown(blog.content)
+            await db.commit()
+            total += len(blogs)
+            print(f"Rendered {total} blogs")
+    print(f"Done: {total} blogs backfilled")
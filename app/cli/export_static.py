@@ -0,0 +1,138 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..services.blog_service import BlogService, format_cursor
+from ..services.render_service import render_blog_page, render_category_page, render_home_page
+from models import Blog
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATE_FILE = ".export-state.json"
+BLOGS_PER_PAGE = 12  # matches category_blogs
+
+def _safe_path(output: str, *parts: str) -> str:
+    """Join URL segments under output, refusing segments that could escape their directory."""
+    segments = [segment for part in parts for segment in part.split("/")]
+    if any(segment in ("", ".", "..") or "\0" in segment for segment in segments):
+        raise ValueError(f"Skipping unsafe path: {'/'.join(parts)}")
+    return os.path.join(output, *segments)
+
+class StaticWriter:
+    def __init__(self, output: str, compress: bool):
+        self.output = output
+        self.compress = compress
+        self.written = 0
+
+    def write(self, page: str, *parts: str):
+        path = _safe_path(self.output, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = page.encode("utf-8")
+        self._write_file(path, data)
+        if self.compress:
+            # mtime=0 keeps output byte-identical across runs
+            self._write_file(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self._write_file(path + ".br", brotli.compress(data, mode=brotli.MODE_TEXT))
+        self.written += 1
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+def _load_state(output: str) -> dict:
+    try:
+        with open(os.path.join(output, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(output: str, state: dict):
+    with open(os.path.join(output, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+async def _export_category(db, env: Environment, writer: StaticWriter, category: str):
+    result = await db.execute(
+        select(Blog.id, Blog.query, Blog.title, Blog.created_at)
+        .where(Blog.category == category)
+        .order_by(Blog.created_at.desc(), Blog.id.desc())
+    )
+    blogs = result.all()
+    total_pages = max(1, (len(blogs) + BLOGS_PER_PAGE - 1) // BLOGS_PER_PAGE)
+    for page in range(1, total_pages + 1):
+        chunk = blogs[(page - 1) * BLOGS_PER_PAGE:page * BLOGS_PER_PAGE]
+        next_cursor = format_cursor(chunk[-1].created_at, chunk[-1].id) if page < total_pages else None
+        html = render_category_page(env, category, chunk, page, total_pages, next_cursor)
+        if page == 1:
+            writer.write(html, "blog", "category", f"{category}.html")
+        writer.write(html, "blog", "category", category, f"page-{page}.html")
+
+async def run(args):
+    started = time.perf_counter()
+    env = Environment(loader=FileSystemLoader(args.templates), autoescape=True)
+    writer = StaticWriter(args.output, compress=not args.no_compress)
+    os.makedirs(args.output, exist_ok=True)
+    if not args.no_compress and brotli is None:
+        print("brotli is not installed; writing .gz files only")
+
+    state = _load_state(args.output) if args.incremental else {}
+    last_id = state.get("last_id", 0)
+    # Ids just below last_id that were exported; a lower id can commit after a higher one,
+    # so that window is checked again on the next run
+    recent_ids = set(state.get("recent_ids", []))
+    window_start = max(0, last_id - settings.REFRESH_ID_OVERLAP)
+
+    async with SessionLocal() as db:
+        max_id = (await db.execute(select(func.max(Blog.id)))).scalar() or 0
+        result = await db.execute(select(Blog.id).where(Blog.id > window_start))
+        new_ids = set(result.scalars().all()) - recent_ids
+        if args.incremental and not new_ids:
+            print("Nothing new since the last export")
+            return
+
+        # Post pages: all of them, or only those not yet exported
+        categories = set()
+        stmt = select(Blog).where(Blog.id > window_start).order_by(Blog.id)
+        result = await db.stream(stmt.execution_options(yield_per=200))
+        async for blog in result.scalars():
+            if blog.id in recent_ids:
+                continue
+            try:
+                writer.write(render_blog_page(env, blog), "blog", "post", f"{blog.query}.html")
+            except ValueError as e:
+                print(e)
+                continue
+            if blog.category:
+                categories.add(blog.category)
+
+        if not args.incremental:
+            result = await db.execute(select(Blog.category).where(Blog.category.isnot(None)).distinct())
+            categories = set(result.scalars().all())
+
+        # New posts shift every page of their category, so those are rewritten in full
+        for category in sorted(categories):
+            try:
+                await _export_category(db, env, writer, category)
+            except ValueError as e:
+                print(e)
+
+        blogs_by_category = await BlogService.home_listing(db)
+        writer.write(render_home_page(env, blogs_by_category), "blog", "index.html")
+
+    recent_ids = sorted(blog_id for blog_id in recent_ids | new_ids if blog_id > max_id - settings.REFRESH_ID_OVERLAP)
+    _save_state(args.output, {"last_id": max_id, "recent_ids": recent_ids, "exported_at": datetime.utcnow().isoformat()})
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {writer.written} pages ({len(categories)} categories) to {args.output} in {elapsed:.1f}s")
@@ -0,0 +1,6 @@
+from ..core.migrations import ensure_schema, schema_fingerprint
+
+async def run(args):
+    upgraded = await ensure_schema(force=args.force)
+    state = "upgraded to" if upgraded else "already at"
+    print(f"Schema {state} {schema_fingerprint()[:12]}")
@@ -0,0 +1,34 @@
+from collections import Counter
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from ..core.database import SessionLocal
+from ..services.category_classifier import category_classifier, normalize_category
+from models import Blog
+
+async def run(args):
+    async with SessionLocal() as db:
+        await category_classifier.load(db)
+        result = await db.execute(select(Blog.id, Blog.query, Blog.category))
+        rows = result.all()
+
+        changes = Counter()
+        updates = {}
+        for blog_id, query, category in rows:
+            new_category = normalize_category(category) or category_classifier.predict(query) or "general"
+            if new_category != category:
+                changes[(category, new_category)] += 1
+                updates.setdefault(new_category, []).append(blog_id)
+
+        for (old, new), count in sorted(changes.items(), key=lambda item: -item[1]):
+            print(f"{old!r} -> {new!r}: {count}")
+        print(f"{sum(changes.values())} of {len(rows)} blogs need a new category")
+
+        if args.dry_run:
+            return
+        for new_category, ids in updates.items():
+            for start in range(0, len(ids), args.batch_size):
+                batch = ids[start:start + args.batch_size]
+                await db.execute(update(Blog).where(Blog.id.in_(batch)).values(category=new_category))
+        await db.commit()
+        print("Categories updated")
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from ..core.database import SessionLocal
+from ..core.rate_limit import TokenBucket
+from ..services.ai_service import AIService
+from ..services.blog_service import BlogService
+from ..services.render_service import render_markdown
+from ..services.topic_service import TopicIndex
+from models import Blog
+
+def _read_topics(path: str):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        seen = set()
+        for line in stream:
+            topic = line.strip()
+            key = BlogService.topic_key(topic)
+            if topic and not topic.startswith("#") and key not in seen:
+                seen.add(key)
+                yield topic
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def _load_checkpoint(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"done": []}
+
+def _save_checkpoint(path: str, done: set):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"done": sorted(done), "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+async def _existing_keys(keys) -> set:
+    existing = set()
+    keys = list(keys)
+    async with SessionLocal() as db:
+        for start in range(0, len(keys), 500):
+            result = await db.execute(select(Blog.query).where(Blog.query.in_(keys[start:start + 500])))
+            existing.update(result.scalars().all())
+    return existing
+
+class BulkWriter:
+    """Buffers generated blogs and writes them with multi-row INSERT ... IGNORE."""
+
+    def __init__(self, batch_size: int, checkpoint: str, done: set):
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.done = done
+        self.rows = []
+        self.written = 0
+        self.ignored = 0
+        self._lock = asyncio.Lock()
+
+    async def add(self, row: dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            rows, self.rows = self.rows, []
+            if not rows:
+                return
+            statement = insert(Blog.__table__).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+            async with SessionLocal() as db:
+                result = await db.execute(statement, rows)
+                await db.commit()
+            # Rows another worker stored meanwhile are ignored, not written
+            inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+            self.written += inserted
+            self.ignored += len(rows) - inserted
+            self.done.update(row["query"] for row in rows)
+            _save_checkpoint(self.checkpoint, self.done)
+
+async def run(args):
+    started = time.perf_counter()
+    checkpoint = _load_checkpoint(args.checkpoint)
+    done = set(checkpoint.get("done", []))
+
+    topics = list(_read_topics(args.file))
+    skipped = sum(1 for topic in topics if BlogService.topic_key(topic) in done)
+    topics = [topic for topic in topics if BlogService.topic_key(topic) not in done]
+    existing = await _existing_keys(BlogService.topic_key(topic) for topic in topics)
+
+    # Reworded versions of stored topics count as existing too
+    topic_index = TopicIndex()
+    await topic_index.refresh()
+    pending = []
+    for topic in topics:
+        if BlogService.topic_key(topic) in existing or topic_index.match(topic) is not None:
+            skipped += 1
+        else:
+            pending.append(topic)
+            topic_index.add(topic)
+    print(f"{len(pending)} topics to generate, {skipped} already exist")
+
+    ai_service = AIService()
+    writer = BulkWriter(args.batch_size, args.checkpoint, done)
+    bucket = TokenBucket(args.rate, capacity=1) if args.rate > 0 else None
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = []
+    latencies = []
+
+    async def generate(topic: str):
+        async with semaphore:
+            if bucket:
+                await bucket.acquire()
+            call_started = time.perf_counter()
+            category, title, content = await ai_service.generate_blog_with_category(topic)
+            latencies.append(time.perf_counter() - call_started)
+        if content.startswith("⚠️"):
+            failures.append(topic)
+            print(f"FAILED: {topic}")
+            return
+        await writer.add({
+            "query": BlogService.topic_key(topic),
+            "title": title,
+            "content": content,
+            "html": render_markdown(content),
+            "category": category,
+        })
+        print(f"ok: {topic}")
+
+    try:
+        await asyncio.gather(*(generate(topic) for topic in pending))
+    finally:
+        # Keep whatever finished before an interruption
+        await writer.flush()
+
+        elapsed = time.perf_counter() - started
+        print(f"\nGenerated {writer.written}, skipped {skipped + writer.ignored}, failed {len(failures)} in {elapsed:.1f}s")
+        if writer.written:
+            print(f"Throughput: {writer.written / elapsed * 60:.1f} blogs/min")
+        if latencies:
+            latencies.sort()
+            print(f"Generation latency: p50 {latencies[len(latencies) // 2]:.1f}s, max {latencies[-1]:.1f}s")
+        for topic in failures:
+            print(f"  failed: {topic}")
@@ -0,0 +1,97 @@
+import math
+import time
+from collections import deque
+from typing import Dict, Optional, Union
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+DEFAULT_KIND = "default"
+
+class CircuitBreaker:
+    """Stops calling an upstream whose recent calls mostly failed or were slow.
+
+    Outcomes of the last `window` calls are kept. Once at least `min_calls` are
+    recorded and the share of failures, or of calls slower than `slow_call`
+    seconds, reaches its threshold, the breaker opens for `cooldown` seconds. It
+    then lets a single probe through (half-open). The probe closes the breaker
+    again if it succeeds and reopens it if it fails.
+
+    Calls whose normal durations differ a lot can be given a `kind`: `slow_call`
+    is then a {kind: seconds} mapping, and p95() is kept per kind.
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, error_rate: float = 0.5,
+                 slow_call: Union[float, Dict[str, float]] = 20.0, slow_rate: float = 0.5, cooldown: float = 30.0):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call = slow_call if isinstance(slow_call, dict) else {DEFAULT_KIND: slow_call}
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)  # (ok, slow)
+        self._latencies: Dict[str, deque] = {}  # kind -> successful call durations, for p95
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self, latency: Optional[float] = None, kind: str = DEFAULT_KIND):
+        if latency is not None:
+            self._latencies.setdefault(kind, deque(maxlen=100)).append(latency)
+        slow = latency is not None and latency >= self.slow_call[kind]
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open()
+            else:
+                self._close()
+            return
+        self._outcomes.append((True, slow))
+        self._check()
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append((False, False))
+        self._check()
+
+    def release(self):
+        """A call that was cancelled says nothing about health; free the probe slot if it held it."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def p95(self, kind: str = DEFAULT_KIND) -> Optional[float]:
+        """95th percentile of recent successful call durations; None until there are enough samples."""
+        latencies = self._latencies.get(kind, ())
+        if len(latencies) < self.min_calls:
+            return None
+        ordered = sorted(latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def _check(self):
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        if failures / calls >= self.error_rate or slow / calls >= self.slow_rate:
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def _close(self):
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._probing = False
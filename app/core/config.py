@@ -10,18 +10,130 @@ class Settings:
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_PORT = int(os.getenv("DB_PORT", 3306))
     DB_NAME = os.getenv("DB_NAME")
+    # Full SQLAlchemy URL; overrides the DB_* settings (e.g. sqlite+aiosqlite:///bench.db)
+    DATABASE_URL = os.getenv("DATABASE_URL")
+    # Optional read replica for listing and post lookups; writes always go to the primary
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    # Connection pool, per engine and per worker process: size it so workers *
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW + MAX_CONCURRENT_GENERATIONS + 2) stays under MySQL's
+    # max_connections (the last two are the lock and write-behind pools)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    # Recycle connections before MySQL's wait_timeout drops them
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
     
     # API Keys
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
     
+    # Upstream API roots, overridable to point at local stand-ins
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # None uses the SDK default
+    GEMINI_API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com")
+    TOGETHER_API_URL = os.getenv("TOGETHER_API_URL", "https://api.together.xyz")
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    
     # App
     USE_GPT = os.getenv("USE_GPT", "true").lower() == "true"
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    ADVISORY_LOCK_TIMEOUT = int(os.getenv("ADVISORY_LOCK_TIMEOUT", 60))
+    # New blogs generated at once per worker; each holds a generation lock connection
+    MAX_CONCURRENT_GENERATIONS = int(os.getenv("MAX_CONCURRENT_GENERATIONS", 8))
+    PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", 512))
+    LISTING_CACHE_TTL = int(os.getenv("LISTING_CACHE_TTL", 60))
+    POST_CACHE_MAX_AGE = int(os.getenv("POST_CACHE_MAX_AGE", 86400))
+    # Seconds between checks for posts other workers added to the search index
+    SEARCH_REFRESH_INTERVAL = int(os.getenv("SEARCH_REFRESH_INTERVAL", 30))
+    # Ids can commit out of order (write-behind batches, pregenerate), so refreshes and
+    # incremental exports re-check this many ids below the highest one they have seen
+    REFRESH_ID_OVERLAP = int(os.getenv("REFRESH_ID_OVERLAP", 1000))
+    # Topics at least this similar to an existing post reuse it instead of generating
+    TOPIC_SIMILARITY_THRESHOLD = float(os.getenv("TOPIC_SIMILARITY_THRESHOLD", 0.7))
+    
+    # Outbound HTTP pools (one client per upstream)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+    HTTP2 = os.getenv("HTTP2", "true").lower() == "true"
+    
+    # Telegram webhook processing
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 8))
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))
+    WEBHOOK_DEDUP_WINDOW = int(os.getenv("WEBHOOK_DEDUP_WINDOW", 10000))
+    WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", 10))
+    BOT_TOKEN_CACHE_TTL = int(os.getenv("BOT_TOKEN_CACHE_TTL", 300))
+    BOT_CACHE_SIZE = int(os.getenv("BOT_CACHE_SIZE", 1024))
+    
+    # Outbound Telegram sends: messages/second per bot and per chat, retries on 429/5xx
+    TELEGRAM_RATE = float(os.getenv("TELEGRAM_RATE", 25))
+    TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", 1))
+    TELEGRAM_CHAT_BURST = float(os.getenv("TELEGRAM_CHAT_BURST", 3))
+    TELEGRAM_CHAT_BUCKETS = int(os.getenv("TELEGRAM_CHAT_BUCKETS", 10000))
+    TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", 3))
+    TELEGRAM_RETRY_BACKOFF = float(os.getenv("TELEGRAM_RETRY_BACKOFF", 0.5))
+    # Give up instead of parking a worker when Telegram asks us to wait longer than this
+    TELEGRAM_MAX_RETRY_AFTER = float(os.getenv("TELEGRAM_MAX_RETRY_AFTER", 60))
+    TELEGRAM_SEND_WORKERS = int(os.getenv("TELEGRAM_SEND_WORKERS", 16))
+    TELEGRAM_SEND_QUEUE_SIZE = int(os.getenv("TELEGRAM_SEND_QUEUE_SIZE", 5000))
+    
+    # Write-behind inserts (new blogs, image records): rows per INSERT, max seconds a row
+    # waits before its batch is written, and rows buffered before the oldest are dropped
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 100))
+    WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", 0.5))
+    WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", 10000))
+    # Seconds a new blog's generation lock is held waiting for its row to be written
+    WRITE_BEHIND_WAIT = float(os.getenv("WRITE_BEHIND_WAIT", 10))
+    
+    # AI providers: model, max in-flight requests and per-call timeout (seconds)
+    OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", 16))
+    OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 60))
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 16))
+    GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 60))
+    # Text providers in failover order; defaults to USE_GPT's choice first
+    LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "openai,gemini" if USE_GPT else "gemini,openai")
+    # A provider is skipped for LLM_BREAKER_COOLDOWN seconds once, among its last
+    # LLM_BREAKER_WINDOW calls, the error rate or the share of calls slower than
+    # the slow-call threshold reaches the given rate. Short calls (categorizing, up to 256
+    # tokens) and article calls (~3000 tokens) are judged separately: a healthy article
+    # routinely takes 30-45s, so its threshold sits just under the 60s provider timeout
+    LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", 20))
+    LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", 5))
+    LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", 0.5))
+    LLM_BREAKER_SLOW_CALL = float(os.getenv("LLM_BREAKER_SLOW_CALL", 50))
+    LLM_BREAKER_SLOW_CALL_SHORT = float(os.getenv("LLM_BREAKER_SLOW_CALL_SHORT", 10))
+    LLM_BREAKER_SLOW_RATE = float(os.getenv("LLM_BREAKER_SLOW_RATE", 0.5))
+    LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", 30))
+    # Send a still-unanswered completion to the next provider after the first one's p95
+    LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+    LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 2))
+    LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 15))
+    TOGETHER_MAX_CONCURRENCY = int(os.getenv("TOGETHER_MAX_CONCURRENCY", 4))
+    TOGETHER_TIMEOUT = float(os.getenv("TOGETHER_TIMEOUT", 60))
+    # Generate category, title and body in one structured-output call instead of two
+    BLOG_SINGLE_CALL = os.getenv("BLOG_SINGLE_CALL", "false").lower() == "true"
+    # Stream new posts to the reader while they are generated
+    BLOG_STREAMING = os.getenv("BLOG_STREAMING", "true").lower() == "true"
+    # Chat reply cache; persisting shares it between workers and restarts
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 86400))
+    RESPONSE_CACHE_PERSIST = os.getenv("RESPONSE_CACHE_PERSIST", "false").lower() == "true"
+    # "." image command: reuse a previous image for the same prompt. Upstream links
+    # expire, so without the local store they are only reused for IMAGE_LINK_TTL seconds.
+    IMAGE_LINK_TTL = int(os.getenv("IMAGE_LINK_TTL", 3600))
+    IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", "")  # empty disables the local store
+    IMAGE_STORE_MAX_BYTES = int(os.getenv("IMAGE_STORE_MAX_BYTES", 1024 ** 3))
+    IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", 10 * 1024 ** 2))
+    # Below this confidence the local category classifier defers to the LLM
+    CATEGORY_MIN_CONFIDENCE = float(os.getenv("CATEGORY_MIN_CONFIDENCE", 0.6))
     
     @property
     def database_url(self) -> str:
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
 settings = Settings()
\ No newline at end of file
@@ -1,10 +1,68 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import hashlib
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .metrics import instrument_engine
 
-engine = create_async_engine(settings.database_url, echo=False)
+def create_engine(url: str, pool_size: int = None, max_overflow: int = None) -> AsyncEngine:
+    """Every engine in the app is built here so pool settings and instrumentation apply to all."""
+    engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine)
+    return engine
+
+engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+# Without a replica, reads share the primary engine and pool
+read_engine = create_engine(settings.REPLICA_DATABASE_URL) if settings.REPLICA_DATABASE_URL else engine
+ReadSessionLocal = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Advisory locks are held for a whole generation, so they get their own pool sized to the
+# generation limit; request reads on the main pool never wait behind the LLM
+lock_engine = create_engine(settings.database_url, pool_size=settings.MAX_CONCURRENT_GENERATIONS, max_overflow=0)
+
+# Write-behind batches get their own small pool so a burst of requests can't starve the flush
+write_engine = create_engine(settings.database_url, pool_size=2, max_overflow=0)
+WriteSessionLocal = sessionmaker(bind=write_engine, class_=AsyncSession, expire_on_commit=False)
+
 async def get_db():
     async with SessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_read_db():
+    """Session for read-only queries; may lag the primary when a replica is configured."""
+    async with ReadSessionLocal() as session:
+        yield session
+
+@asynccontextmanager
+async def advisory_lock(name: str, timeout: int = None):
+    """Hold a named MySQL lock (GET_LOCK) so separate workers serialize on the same key.
+
+    Yields True when the lock was acquired, False on timeout. On dialects without
+    named locks this is a no-op that always yields True.
+    """
+    if lock_engine.dialect.name != "mysql":
+        yield True
+        return
+
+    timeout = settings.ADVISORY_LOCK_TIMEOUT if timeout is None else timeout
+    # MySQL caps lock names at 64 characters
+    lock_name = "lock:" + hashlib.sha1(name.encode("utf-8")).hexdigest()
+    async with lock_engine.connect() as conn:
+        result = await conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": lock_name, "timeout": timeout})
+        acquired = result.scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": lock_name})
@@ -0,0 +1,67 @@
+import logging
+import ssl
+from typing import Dict, Optional
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Per-upstream request timeouts (seconds) and whether the upstream speaks HTTP/2
+UPSTREAMS = {
+    "gemini": {"timeout": settings.GEMINI_TIMEOUT, "http2": True},
+    "telegram": {"timeout": 10.0, "http2": True},
+    "together": {"timeout": settings.TOGETHER_TIMEOUT, "http2": True},
+    # Downloads of generated images into the local image store
+    "images": {"timeout": 30.0, "http2": True},
+}
+
+class HTTPClients:
+    """One long-lived, pooled httpx.AsyncClient per upstream.
+
+    Clients are opened by the app lifespan and closed on shutdown; outside the
+    app (CLI commands) they are created on first use.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        upstream = UPSTREAMS[name]
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        http2 = upstream["http2"] and settings.HTTP2 and HTTP2_AVAILABLE
+        if self._ssl_context is None:
+            # Loading the CA bundle is the slow part of creating a client; do it once for all of them
+            self._ssl_context = httpx.create_ssl_context()
+        return httpx.AsyncClient(timeout=upstream["timeout"], limits=limits, http2=http2, verify=self._ssl_context)
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create(name)
+            self._clients[name] = client
+        return client
+
+    async def start(self):
+        if settings.HTTP2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+http_clients = HTTPClients()
@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class CachedPage:
+    """A rendered page with its validators; compressed bodies are built once and kept."""
+
+    __slots__ = ("html", "etag", "last_modified", "_bodies")
+
+    def __init__(self, html: str, etag: str = None, last_modified: Optional[datetime] = None):
+        self.html = html
+        self.etag = etag or content_etag(html)
+        self.last_modified = last_modified
+        self._bodies: Dict[str, bytes] = {}
+
+    def body(self, encoding: str) -> bytes:
+        data = self._bodies.get(encoding)
+        if data is None:
+            data = self.html.encode("utf-8")
+            if encoding == "br":
+                data = brotli.compress(data, mode=brotli.MODE_TEXT)
+            elif encoding == "gzip":
+                data = gzip.compress(data, compresslevel=6, mtime=0)
+            self._bodies[encoding] = data
+        return data
+
+def content_etag(html: str) -> str:
+    return '"' + hashlib.sha1(html.encode("utf-8")).hexdigest()[:20] + '"'
+
+def record_etag(kind: str, record_id: int, created_at: Optional[datetime]) -> str:
+    stamp = 0
+    if created_at is not None:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        stamp = int(created_at.timestamp())
+    return f'"{kind}-{record_id}-{stamp}"'
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since; compare weakly
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def choose_encoding(accept_encoding: str) -> str:
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return "identity"
+
+def page_response(request: Request, page: CachedPage, max_age: int) -> Response:
+    """Serve a cached page honouring conditional requests and Accept-Encoding."""
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+    if page.last_modified is not None:
+        headers["Last-Modified"] = _http_date(page.last_modified)
+
+    if is_not_modified(request, page.etag, page.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(page.body(encoding), media_type="text/html", headers=headers)
+
+def not_modified_response(etag: str, last_modified: Optional[datetime], max_age: int) -> Response:
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}", "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return Response(status_code=304, headers=headers)
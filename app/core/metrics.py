@@ -0,0 +1,236 @@
+"""Minimal in-process Prometheus metrics: counters, histograms and callback gauges.
+
+Updates are plain dict operations so instrumentation can stay on in production.
+Each worker process exposes its own values on /metrics.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self._values.items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def collect(self) -> List[str]:
+        lines = []
+        for key, entry in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {entry[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {entry[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {entry[-1]}")
+        return lines
+
+class CallbackMetric(Metric):
+    """Samples read from a callback at scrape time, for state owned elsewhere."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str],
+                 callback: Callable[[], Dict[Tuple, float]], kind: str = "gauge"):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        self.kind = kind
+
+    def collect(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in self.callback().items()]
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def callback(self, name: str, documentation: str, labels: Sequence[str],
+                 callback: Callable[[], Dict[Tuple, float]], kind: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, labels, callback, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "db_time_per_request_seconds", "Total SQL time per HTTP request", ("route",)
+)
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "Upstream AI provider call latency", ("provider", "operation")
+)
+LLM_ERRORS = registry.counter("llm_errors_total", "Failed upstream AI provider calls", ("provider", "error"))
+LLM_FAILOVERS = registry.counter("llm_failovers_total", "Calls moved to the next provider after a failure", ("provider",))
+LLM_HEDGES = registry.counter("llm_hedges_total", "Calls hedged because the provider was slower than its p95", ("provider",))
+LLM_TOKENS = registry.counter("llm_tokens_total", "Tokens reported by AI providers", ("provider", "kind"))
+TELEGRAM_SEND_DURATION = registry.histogram(
+    "telegram_send_duration_seconds", "Telegram Bot API call latency", ("method",)
+)
+TELEGRAM_SENDS = registry.counter("telegram_sends_total", "Telegram Bot API calls by outcome", ("method", "outcome"))
+TELEGRAM_RETRIES = registry.counter("telegram_retries_total", "Telegram Bot API calls retried", ("method",))
+TELEGRAM_DELIVERY_DURATION = registry.histogram(
+    "telegram_delivery_duration_seconds", "Time from queueing a reply to its last part being sent"
+)
+
+# Caches exposing hits/misses counters, keyed by the name used in the cache label
+_caches: Dict[str, object] = {}
+
+def track_cache(name: str, cache):
+    _caches[name] = cache
+
+def _cache_lookups() -> Dict[Tuple, float]:
+    samples = {}
+    for name, cache in _caches.items():
+        samples[(name, "hit")] = cache.hits
+        samples[(name, "miss")] = cache.misses
+    return samples
+
+def _cache_hit_ratios() -> Dict[Tuple, float]:
+    samples = {}
+    for name, cache in _caches.items():
+        lookups = cache.hits + cache.misses
+        samples[(name,)] = round(cache.hits / lookups, 4) if lookups else 0.0
+    return samples
+
+registry.callback("cache_lookups_total", "Cache lookups by result", ("cache", "result"), _cache_lookups, kind="counter")
+registry.callback("cache_hit_ratio", "Cache hits over lookups since start", ("cache",), _cache_hit_ratios)
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def instrument_engine(engine):
+    """Time every statement on the engine and attribute it to the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        DB_QUERY_DURATION.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per route template.
+
+    Timing covers the whole response, including streamed bodies. Unmatched paths
+    share one label so scanners can't blow up the series count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            DB_QUERIES_PER_REQUEST.observe(stats.queries, route)
+            DB_TIME_PER_REQUEST.observe(stats.db_time, route)
@@ -0,0 +1,73 @@
+import hashlib
+import logging
+from typing import Optional
+from sqlalchemy import delete, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from .database import advisory_lock, engine
+from models import Base, SchemaVersion
+
+logger = logging.getLogger(__name__)
+
+def upgrade_schema(conn: Connection):
+    """Create missing tables, then add columns and indexes that create_all skips on existing tables."""
+    Base.metadata.create_all(conn)
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=conn.dialect)
+                logger.info(f"Adding column {table.name}.{column.name}")
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                logger.info(f"Creating index {index.name}")
+                index.create(conn)
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column and index the models declare; changes whenever a model does."""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            parts.append(f"column {column.name} {column.type!r} {column.nullable}")
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            parts.append(f"index {index.name} {[column.name for column in index.columns]} {index.unique}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def stored_version(conn: Connection) -> Optional[str]:
+    try:
+        return conn.execute(select(SchemaVersion.version).order_by(SchemaVersion.id.desc()).limit(1)).scalar()
+    except DBAPIError:
+        # No schema_version table yet
+        return None
+
+def store_version(conn: Connection, version: str):
+    conn.execute(delete(SchemaVersion))
+    conn.execute(SchemaVersion.__table__.insert().values(version=version))
+
+async def ensure_schema(force: bool = False) -> bool:
+    """Upgrade the schema unless it already matches the models; True if an upgrade ran.
+
+    Checking the stored fingerprint is one query, where upgrade_schema reflects
+    every table. Workers that boot together take a named lock so only one upgrades.
+    """
+    version = schema_fingerprint()
+    if not force:
+        async with engine.connect() as conn:
+            if await conn.run_sync(stored_version) == version:
+                return False
+
+    async with advisory_lock("schema-upgrade"):
+        async with engine.begin() as conn:
+            # Another worker may have upgraded while this one waited for the lock
+            if not force and await conn.run_sync(stored_version) == version:
+                return False
+            await conn.run_sync(upgrade_schema)
+            await conn.run_sync(store_version, version)
+    logger.info(f"Schema upgraded to {version[:12]}")
+    return True
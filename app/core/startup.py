@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+class StartupTimer:
+    """Seconds spent in each startup phase, in the order they ran."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def report(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+
+    def stats(self) -> Dict[str, float]:
+        return {name: round(seconds, 4) for name, seconds in self.phases.items()}
+
+startup_timer = StartupTimer()
@@ -0,0 +1,39 @@
+import re
+from typing import List
+
+STOPWORDS = frozenset("""
+a about above after again all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his
+how i if in into is it its itself just me more most my now of off on once only or other our ours out
+over own same she should so some such than that the their theirs them then there these they this those through
+to too under until up very was we were what when where which while who whom why will with you your yours
+""".split())
+
+# Kept out of STOPWORDS: "python is not slow" and "is python slow" are different topics
+NEGATIONS = frozenset(("no", "nor", "not", "never", "without"))
+
+# Words that flip a topic into its opposite: "eat before a workout" vs "after a workout"
+_OPPOSITE_PAIRS = (
+    ("before", "after"), ("up", "down"), ("over", "under"), ("above", "below"), ("on", "off"), ("in", "out"),
+    ("more", "less"), ("more", "fewer"), ("most", "least"), ("few", "many"),
+)
+OPPOSITES = {}
+for _a, _b in _OPPOSITE_PAIRS:
+    OPPOSITES.setdefault(_a, set()).add(_b)
+    OPPOSITES.setdefault(_b, set()).add(_a)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str, drop_stopwords: bool = True) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    if drop_stopwords:
+        tokens = [token for token in tokens if token not in STOPWORDS]
+    return tokens
+
+def stem(token: str) -> str:
+    # Just enough folding that "decorator" matches "decorators"
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class WorkQueue:
+    """Bounded in-process queue consumed by a pool of async workers.
+
+    Items carrying a dedup key are dropped if the same key was accepted within
+    the last `dedup_window` submissions. submit() never blocks: when the queue
+    is full it returns False so the caller can push back on the producer.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], Awaitable[None]], maxsize: int, workers: int,
+                 dedup_window: int = 0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._maxsize = maxsize
+        self._tasks: List[asyncio.Task] = []
+        self._seen = LRUCache(dedup_window) if dedup_window else None
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._maxsize)
+        return self._queue
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0):
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name}: dropping {self.queue.qsize()} queued items on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, item: Any, dedup_key: Hashable = None) -> bool:
+        if dedup_key is not None and self._seen is not None and dedup_key in self._seen:
+            self.duplicates += 1
+            return True
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"{self.name}: queue full ({self._maxsize}), rejecting item")
+            return False
+        if dedup_key is not None and self._seen is not None:
+            self._seen.set(dedup_key, True)
+        self.accepted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            item = await self.queue.get()
+            self.busy += 1
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name}: error processing item: {e}")
+            finally:
+                self.busy -= 1
+                self.queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self._maxsize,
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
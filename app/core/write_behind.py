@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.future import select
+
+from .database import WriteSessionLocal
+
+logger = logging.getLogger(__name__)
+
+class WriteBehind:
+    """Buffers inserts into one table and writes them as multi-row INSERTs off the request path.
+
+    A batch is written once `batch_size` rows are waiting, or `interval` seconds
+    after the first of them arrived. Rows that hit a unique key already stored are
+    skipped (INSERT IGNORE), so a row written twice is harmless. When `key` names a
+    unique column, add() returns a future resolved with the stored row, id included,
+    or None if it could not be written. Failed batches are put back and retried;
+    beyond `max_pending` rows the oldest are dropped.
+    """
+
+    def __init__(self, name: str, model, batch_size: int, interval: float, max_pending: int, key: str = None):
+        self.name = name
+        self.model = model
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.key = key
+        self._statement = (
+            insert(model.__table__).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+        )
+        self._rows: List[Tuple[dict, Optional[asyncio.Future]]] = []
+        self._writing = 0
+        self._added: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.ignored = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._rows) + self._writing
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._added = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Write everything still buffered, giving up after `timeout` seconds."""
+        if self._task is not None:
+            self._stopping = True
+            self._added.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._rows:
+            logger.error(f"{self.name}: dropping {len(self._rows)} unwritten rows on shutdown")
+            self._drop(len(self._rows))
+
+    def add(self, values: dict) -> Optional[asyncio.Future]:
+        future = asyncio.get_running_loop().create_future() if self.key else None
+        self._rows.append((values, future))
+        if len(self._rows) > self.max_pending:
+            logger.warning(f"{self.name}: buffer full ({self.max_pending}), dropping the oldest row")
+            self._drop(1)
+        self.start()
+        self._added.set()
+        return future
+
+    async def flush(self) -> bool:
+        """Write every buffered row now; False if a batch failed."""
+        while self._rows:
+            if not await self._write_batch():
+                return False
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            if not self._rows:
+                self._added.clear()
+                await self._added.wait()
+                continue
+            deadline = loop.time() + self.interval
+            while len(self._rows) < self.batch_size and not self._stopping:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._added.clear()
+                try:
+                    await asyncio.wait_for(self._added.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if self._stopping:
+                break
+            if not await self._write_batch():
+                # Back off before retrying; add() keeps accepting rows meanwhile
+                await asyncio.sleep(max(self.interval, 1.0))
+
+    async def _write_batch(self) -> bool:
+        batch, self._rows = self._rows[:self.batch_size], self._rows[self.batch_size:]
+        self._writing = len(batch)
+        try:
+            stored = {}
+            async with WriteSessionLocal() as db:
+                result = await db.execute(self._statement, [values for values, _ in batch])
+                if self.key:
+                    keys = [values[self.key] for values, _ in batch]
+                    rows = await db.execute(select(self.model).where(getattr(self.model, self.key).in_(keys)))
+                    stored = {getattr(row, self.key): row for row in rows.scalars()}
+                await db.commit()
+        except asyncio.CancelledError:
+            # Shutdown timed out mid-write; stop() reports these as dropped
+            self._rows[:0] = batch
+            raise
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"{self.name}: writing {len(batch)} rows failed, will retry: {e}")
+            self._rows[:0] = batch
+            if len(self._rows) > self.max_pending:
+                self._drop(len(self._rows) - self.max_pending)
+            return False
+        finally:
+            self._writing = 0
+
+        self.batches += 1
+        inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(batch)
+        self.written += inserted
+        self.ignored += len(batch) - inserted
+        for values, future in batch:
+            if future is not None and not future.done():
+                future.set_result(stored.get(values[self.key]))
+        return True
+
+    def _drop(self, count: int):
+        dropped, self._rows = self._rows[:count], self._rows[count:]
+        self.dropped += len(dropped)
+        for _, future in dropped:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.depth,
+            "capacity": self.max_pending,
+            "written": self.written,
+            "ignored": self.ignored,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
@@ -1,81 +1,108 @@
-import openai
-import httpx
-from typing import Tuple, Optional
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Tuple, Optional
 from ..core.config import settings
+from .category_classifier import category_classifier, normalize_category
+from .providers import FailoverProvider, GeminiProvider, OpenAIProvider, TextProvider
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+ERROR_MESSAGE = "⚠️ Sorry, I couldn't reach the AI service. Please try again later."
+
+SINGLE_CALL_PROMPT = (
+    "Write a comprehensive blog article about: {topic}\n\n"
+    "Respond with a JSON object with exactly these keys:\n"
+    '"category": one lowercase word categorizing the topic,\n'
+    '"title": the article title,\n'
+    '"content": the full article in markdown, starting with a "# " title line.'
+)
+
+def extract_title(content: str, topic: str) -> str:
+    title_line = next((line for line in content.splitlines() if line.startswith("# ")), None)
+    return title_line[2:].strip() if title_line else topic.title()
+
+TEXT_PROVIDERS = {
+    "openai": (OpenAIProvider, "OPENAI_API_KEY"),
+    "gemini": (GeminiProvider, "GEMINI_API_KEY"),
+}
+
+def build_text_provider() -> FailoverProvider:
+    """Providers from LLM_PROVIDERS, leaving out those without an API key (unless none has one)."""
+    names = [name.strip() for name in settings.LLM_PROVIDERS.split(",") if name.strip() in TEXT_PROVIDERS]
+    configured = [name for name in names if getattr(settings, TEXT_PROVIDERS[name][1])]
+    return FailoverProvider([TEXT_PROVIDERS[name][0]() for name in configured or names], hedge=settings.LLM_HEDGE)
+
+# Shared by every AIService so breakers and concurrency limits are per process
+text_provider = build_text_provider()
 
 class AIService:
-    def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY) if settings.USE_GPT else None
-        self.gemini_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+    def __init__(self, provider: FailoverProvider = None):
+        self.provider = provider or text_provider
 
     async def generate_response(self, prompt: str) -> str:
-        if settings.USE_GPT:
-            return await self._call_openai(prompt)
-        return await self._call_gemini(prompt)
+        provider = self.provider
+        return await response_cache.get_or_compute(
+            prompt, provider.name, provider.model, lambda: self._complete_response(provider, prompt)
+        )
+
+    async def _complete_response(self, provider: TextProvider, prompt: str) -> str:
+        try:
+            return await provider.complete(prompt, max_tokens=2000, temperature=0.7)
+        except Exception:
+            return ERROR_MESSAGE
 
     async def generate_blog_with_category(self, topic: str) -> Tuple[Optional[str], Optional[str], str]:
         try:
-            if settings.USE_GPT:
-                return await self._generate_blog_gpt(topic)
-            return await self._generate_blog_gemini(topic)
+            if settings.BLOG_SINGLE_CALL:
+                blog = await self._generate_blog_single_call(self.provider, topic)
+                if blog:
+                    return blog
+            return await self._generate_blog(self.provider, topic)
         except Exception as e:
-            return None, None, "⚠️ Sorry, I couldn't reach the AI service. Please try again later."
+            return None, None, ERROR_MESSAGE
 
-    async def _call_openai(self, prompt: str) -> str:
+    async def categorize(self, topic: str, provider: TextProvider = None) -> str:
+        # The local classifier handles most topics; only ask the LLM when it isn't confident
+        category = category_classifier.predict(topic)
+        if category:
+            return category
+        provider = provider or self.provider
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=2000,
-                temperature=0.7
+            raw_category = await provider.complete(
+                f"Categorize this topic into one word: {topic}", max_tokens=10, temperature=0.3
             )
-            return response.choices[0].message.content
         except Exception:
-            return "⚠️ Sorry, I couldn't reach the AI service. Please try again later."
+            return "general"
+        return normalize_category(raw_category) or "general"
+
+    async def stream_blog(self, topic: str) -> AsyncIterator[str]:
+        async for chunk in self.provider.stream(
+            f"Write a comprehensive blog article about: {topic}", max_tokens=3000, temperature=0.7
+        ):
+            yield chunk
 
-    async def _generate_blog_gpt(self, topic: str) -> Tuple[str, str, str]:
-        # Get category
-        category_response = self.openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": f"Categorize this topic into one word: {topic}"}],
-            max_tokens=10,
-            temperature=0.3
+    async def _generate_blog(self, provider: TextProvider, topic: str) -> Tuple[str, str, str]:
+        # Category and article are independent, so request both at once
+        category, content = await asyncio.gather(
+            self.categorize(topic, provider),
+            provider.complete(f"Write a comprehensive blog article about: {topic}", max_tokens=3000, temperature=0.7),
         )
-        category = category_response.choices[0].message.content.strip().lower()
-        
-        # Generate blog
-        blog_response = self.openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": f"Write a comprehensive blog article about: {topic}"}],
-            max_tokens=3000,
-            temperature=0.7
+        return category, extract_title(content, topic), content
+
+    async def _generate_blog_single_call(self, provider: TextProvider, topic: str) -> Optional[Tuple[str, str, str]]:
+        """Category, title and body from one structured-output call; None if the reply is unusable."""
+        raw = await provider.complete(
+            SINGLE_CALL_PROMPT.format(topic=topic), max_tokens=3200, temperature=0.7, json_mode=True
         )
-        content = blog_response.choices[0].message.content
-        
-        # Extract title
-        title_line = next((line for line in content.splitlines() if line.startswith("# ")), None)
-        title = title_line[2:].strip() if title_line else topic.title()
-        
+        try:
+            data = json.loads(raw)
+            category = str(data["category"]).strip().lower()
+            content = str(data["content"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Unparseable single-call blog response for '{topic}', falling back to two calls")
+            return None
+        title = str(data.get("title") or "").strip() or extract_title(content, topic)
+        category = category_classifier.predict(topic) or normalize_category(category) or "general"
         return category, title, content
-
-    async def _call_gemini(self, prompt: str) -> str:
-        headers = {"Content-Type": "application/json"}
-        params = {"key": settings.GEMINI_API_KEY}
-        json_data = {"contents": [{"parts": [{"text": prompt}]}]}
-        
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(self.gemini_url, headers=headers, params=params, json=json_data)
-            response.raise_for_status()
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"]
-
-    async def _generate_blog_gemini(self, topic: str) -> Tuple[str, str, str]:
-        category = await self._call_gemini(f"Categorize this topic into one word: {topic}")
-        category = category.strip().lower()
-        
-        content = await self._call_gemini(f"Write a comprehensive blog article about: {topic}")
-        
-        title_line = next((line for line in content.splitlines() if line.startswith("# ")), None)
-        title = title_line[2:].strip() if title_line else topic.title()
-        
-        return category, title, content
\ No newline at end of file
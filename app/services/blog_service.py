@@ -0,0 +1,283 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.future import select
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+from ..core.database import SessionLocal, advisory_lock
+from ..core.singleflight import Broadcast, SingleFlight
+from ..core.write_behind import WriteBehind
+from .ai_service import AIService, ERROR_MESSAGE, extract_title
+from .category_classifier import category_classifier
+from .render_service import render_markdown
+from models import Blog
+
+logger = logging.getLogger(__name__)
+
+Cursor = Tuple[datetime, int]
+
+# New blogs are written in batches; readers get the page before the row is committed
+blog_writes = WriteBehind(
+    "blogs", Blog,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    interval=settings.WRITE_BEHIND_INTERVAL,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+    key="query",
+)
+
+def format_cursor(created_at: datetime, blog_id: int) -> str:
+    return f"{created_at.isoformat()},{blog_id}"
+
+def parse_cursor(value: str) -> Optional[Cursor]:
+    try:
+        created_at, blog_id = value.rsplit(",", 1)
+        return datetime.fromisoformat(created_at), int(blog_id)
+    except ValueError:
+        return None
+
+class BlogService:
+    def __init__(self, ai_service: AIService):
+        self.ai_service = ai_service
+        self._inflight = SingleFlight()
+        self._streams: Dict[str, Broadcast] = {}
+        # Generated blogs waiting for their batch to be written, by topic key
+        self._unsaved: Dict[str, Blog] = {}
+        # Background generations; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        # Taken before the generation lock, so queued topics don't hold lock connections
+        self._generations = asyncio.Semaphore(settings.MAX_CONCURRENT_GENERATIONS)
+        # Called with each newly committed Blog, e.g. to drop cached listings
+        self.on_created: List[Callable[[Blog], None]] = [self._forget_category_count, self._learn_category]
+        self._category_counts = LRUCache(settings.PAGE_CACHE_SIZE, ttl=settings.LISTING_CACHE_TTL)
+
+    @staticmethod
+    def topic_key(topic: str) -> str:
+        return topic.lower()
+
+    async def get_or_generate(self, topic: str) -> Tuple[Optional[Blog], Optional[str]]:
+        """Return (blog, error). Concurrent callers for the same topic share one generation."""
+        key = self.topic_key(topic)
+        blog = self._unsaved.get(key)
+        if blog is not None:
+            return blog, None
+        broadcast = self._streams.get(key)
+        if broadcast is not None:
+            await broadcast.wait()
+            return broadcast.result, broadcast.error
+        return await self._inflight.do(key, lambda: self._generate(topic, key))
+
+    def stream(self, topic: str) -> Broadcast:
+        """Start (or join) a streaming generation; the Broadcast's result is the saved Blog.
+
+        The generation runs in its own task, so it completes and is stored even if
+        every reader disconnects.
+        """
+        key = self.topic_key(topic)
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = Broadcast()
+            self._streams[key] = broadcast
+            task = self._spawn(self._generate_streaming(topic, key, broadcast))
+            task.add_done_callback(lambda _: self._streams.pop(key, None))
+        return broadcast
+
+    async def _generate_streaming(self, topic: str, key: str, broadcast: Broadcast):
+        try:
+            async with self._generations, advisory_lock(f"blog:{key}"):
+                blog = self._unsaved.get(key)
+                if blog is None:
+                    async with SessionLocal() as db:
+                        blog = await self._find(db, key)
+                if blog:
+                    await broadcast.publish(blog.content)
+                    await broadcast.finish(result=blog)
+                    return
+
+                category_task = asyncio.ensure_future(self.ai_service.categorize(topic))
+                parts = []
+                try:
+                    async for chunk in self.ai_service.stream_blog(topic):
+                        parts.append(chunk)
+                        await broadcast.publish(chunk)
+                except BaseException:
+                    category_task.cancel()
+                    raise
+                category = await category_task
+
+                content = "".join(parts)
+                if not content.strip():
+                    raise ValueError("empty completion")
+                blog, saved = self._save(key, category, extract_title(content, topic), content)
+                await broadcast.finish(result=blog)
+                await self._hold_until_saved(key, saved)
+            await self._announce(key, saved)
+        except Exception as e:
+            logger.error(f"Streaming generation failed for '{key}': {e}")
+            if not broadcast.done:
+                await broadcast.finish(error=ERROR_MESSAGE)
+
+    async def _generate(self, topic: str, key: str) -> Tuple[Optional[Blog], Optional[str]]:
+        # The work runs in its own task so it can keep the lock after the caller has its blog
+        ready = asyncio.get_running_loop().create_future()
+        self._spawn(self._generate_locked(topic, key, ready))
+        return await ready
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self, timeout: float):
+        """Wait for generations in flight, so their rows reach blog_writes before it is stopped."""
+        if not self._tasks:
+            return
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            logger.warning(f"Abandoning {len(pending)} blog generations on shutdown")
+
+    async def _generate_locked(self, topic: str, key: str, ready: asyncio.Future):
+        def resolve(blog: Optional[Blog], error: Optional[str] = None):
+            if not ready.done():
+                ready.set_result((blog, error))
+
+        try:
+            async with self._generations, advisory_lock(f"blog:{key}") as acquired:
+                if not acquired:
+                    logger.warning(f"Timed out waiting for generation lock on '{key}'")
+
+                # Another worker may have finished while we waited on the lock
+                async with SessionLocal() as db:
+                    blog = await self._find(db, key)
+                if blog:
+                    return resolve(blog)
+
+                category, title, content = await self.ai_service.generate_blog_with_category(topic)
+                if content.startswith("⚠️"):
+                    return resolve(None, content)
+
+                blog, saved = self._save(key, category, title, content)
+                resolve(blog)
+                await self._hold_until_saved(key, saved)
+            await self._announce(key, saved)
+        except Exception as e:
+            if ready.done():
+                logger.error(f"Saving generated blog '{key}' failed: {e}")
+            else:
+                ready.set_exception(e)
+
+    def _save(self, key: str, category: str, title: str, content: str) -> Tuple[Blog, asyncio.Future]:
+        """Queue the row for the next batch; returns an unsaved Blog (no id yet) and the write's future."""
+        values = dict(query=key, title=title, content=content, html=render_markdown(content), category=category,
+                      created_at=datetime.utcnow())
+        blog = Blog(**values)
+        self._unsaved[key] = blog
+        return blog, blog_writes.add(values)
+
+    @staticmethod
+    async def _hold_until_saved(key: str, saved: asyncio.Future):
+        """Called with the generation lock held: workers waiting on it look for the row next."""
+        try:
+            await asyncio.wait_for(asyncio.shield(saved), settings.WRITE_BEHIND_WAIT)
+        except asyncio.TimeoutError:
+            logger.warning(f"Blog '{key}' not written after {settings.WRITE_BEHIND_WAIT:g}s, releasing its lock")
+
+    async def _announce(self, key: str, saved: asyncio.Future):
+        """Wait for the blog's batch, then run the on_created callbacks with the stored row."""
+        try:
+            blog = await saved
+        finally:
+            self._unsaved.pop(key, None)
+        if blog is None:
+            logger.error(f"Generated blog '{key}' was not saved")
+            return
+        for callback in self.on_created:
+            callback(blog)
+
+    @staticmethod
+    async def store_html(blog: Blog):
+        """Persist HTML rendered for a row that was loaded without it, possibly from the replica."""
+        async with SessionLocal() as db:
+            await db.execute(update(Blog).where(Blog.id == blog.id).values(html=blog.html))
+            await db.commit()
+
+    @staticmethod
+    async def _find(db, key: str) -> Optional[Blog]:
+        result = await db.execute(select(Blog).where(Blog.query == key))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def home_listing(db, per_category: int = 3) -> dict:
+        """{category: {'blogs': newest rows, 'total': count}}, ordered by category size."""
+        # Top blogs per category plus category totals in a single windowed query
+        ranked = (
+            select(
+                Blog.query,
+                Blog.title,
+                Blog.category,
+                Blog.created_at,
+                func.row_number().over(partition_by=Blog.category, order_by=Blog.created_at.desc()).label('position'),
+                func.count(Blog.id).over(partition_by=Blog.category).label('total'),
+            )
+            .where(Blog.category.isnot(None))
+            .subquery()
+        )
+        result = await db.execute(
+            select(ranked)
+            .where(ranked.c.position <= per_category)
+            .order_by(ranked.c.total.desc(), ranked.c.category, ranked.c.position)
+        )
+
+        blogs_by_category = {}
+        for row in result.all():
+            data = blogs_by_category.setdefault(row.category, {'blogs': [], 'total': row.total})
+            data['blogs'].append(row)
+        return blogs_by_category
+
+    async def category_count(self, db, category: str) -> int:
+        total = self._category_counts.get(category)
+        if total is None:
+            result = await db.execute(select(func.count(Blog.id)).where(Blog.category == category))
+            total = result.scalar() or 0
+            self._category_counts.set(category, total)
+        return total
+
+    def _forget_category_count(self, blog: Blog):
+        self._category_counts.pop(blog.category)
+
+    @staticmethod
+    def _learn_category(blog: Blog):
+        category_classifier.learn(blog.query, blog.category)
+
+    async def page_cursor(self, db, category: str, page: int, per_page: int) -> Optional[Cursor]:
+        """Cursor of the last row before `page`, found with an index-only scan."""
+        if page <= 1:
+            return None
+        result = await db.execute(
+            select(Blog.created_at, Blog.id)
+            .where(Blog.category == category)
+            .order_by(Blog.created_at.desc(), Blog.id.desc())
+            .offset((page - 1) * per_page - 1)
+            .limit(1)
+        )
+        row = result.first()
+        return (row.created_at, row.id) if row else None
+
+    async def category_page(self, db, category: str, after: Optional[Cursor], per_page: int):
+        stmt = (
+            select(Blog.id, Blog.query, Blog.title, Blog.created_at)
+            .where(Blog.category == category)
+            .order_by(Blog.created_at.desc(), Blog.id.desc())
+            .limit(per_page)
+        )
+        if after:
+            created_at, blog_id = after
+            stmt = stmt.where(or_(
+                Blog.created_at < created_at,
+                and_(Blog.created_at == created_at, Blog.id < blog_id),
+            ))
+        result = await db.execute(stmt)
+        return result.all()
@@ -0,0 +1,38 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+from models import BotConfig
+
+class BotService:
+    """Bot tokens cached in-process; the webhook hot path makes no DB calls once warm."""
+
+    def __init__(self):
+        self._tokens = LRUCache(settings.BOT_CACHE_SIZE, ttl=settings.BOT_TOKEN_CACHE_TTL)
+
+    async def get_token(self, db: AsyncSession, name: str) -> Optional[str]:
+        token = self._tokens.get(name)
+        if token is None:
+            result = await db.execute(select(BotConfig).where(BotConfig.name == name))
+            bot = result.scalars().first()
+            if bot:
+                token = bot.token
+                self._tokens.set(name, token)
+        return token
+
+    async def upsert_token(self, db: AsyncSession, name: str, token: str):
+        if self._tokens.get(name) == token:
+            return
+
+        result = await db.execute(select(BotConfig).where(BotConfig.name == name))
+        bot = result.scalars().first()
+        if bot:
+            if bot.token != token:
+                bot.token = token
+                await db.commit()
+        else:
+            db.add(BotConfig(name=name, token=token))
+            await db.commit()
+        self._tokens.set(name, token)
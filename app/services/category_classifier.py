@@ -0,0 +1,136 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.future import select
+
+from ..core.config import settings
+from ..core.text import tokenize
+from models import Blog
+
+# The fixed set every blog category is mapped onto; "general" catches the rest
+CATEGORIES = (
+    "tech", "science", "business", "finance", "health", "fitness", "cooking", "travel",
+    "education", "lifestyle", "entertainment", "sports", "history", "general",
+)
+
+# Common LLM answers that mean one of the fixed categories
+ALIASES = {
+    "technology": "tech", "programming": "tech", "software": "tech", "coding": "tech", "computing": "tech",
+    "ai": "tech", "it": "tech", "gadgets": "tech", "internet": "tech",
+    "physics": "science", "biology": "science", "chemistry": "science", "astronomy": "science", "space": "science",
+    "economics": "finance", "money": "finance", "investing": "finance", "investment": "finance",
+    "crypto": "finance", "cryptocurrency": "finance", "banking": "finance",
+    "marketing": "business", "entrepreneurship": "business", "startup": "business", "startups": "business",
+    "career": "business", "management": "business",
+    "wellness": "health", "medicine": "health", "medical": "health", "nutrition": "health",
+    "mentalhealth": "health", "psychology": "health",
+    "exercise": "fitness", "workout": "fitness", "gym": "fitness", "bodybuilding": "fitness", "yoga": "fitness",
+    "food": "cooking", "recipes": "cooking", "recipe": "cooking", "baking": "cooking", "cuisine": "cooking",
+    "culinary": "cooking",
+    "tourism": "travel", "adventure": "travel",
+    "learning": "education", "academics": "education", "school": "education",
+    "fashion": "lifestyle", "beauty": "lifestyle", "home": "lifestyle", "parenting": "lifestyle",
+    "relationships": "lifestyle", "selfimprovement": "lifestyle", "productivity": "lifestyle",
+    "movies": "entertainment", "music": "entertainment", "gaming": "entertainment", "games": "entertainment",
+    "film": "entertainment", "television": "entertainment", "books": "entertainment",
+    "sport": "sports", "football": "sports", "cricket": "sports", "soccer": "sports", "basketball": "sports",
+    "politics": "general", "news": "general", "religion": "general", "environment": "general",
+    "other": "general", "miscellaneous": "general",
+}
+
+# Seed vocabulary so the classifier is useful before any blogs exist
+SEED_KEYWORDS = {
+    "tech": "python javascript code programming software computer ai machine learning api database cloud web app "
+            "linux docker kubernetes react android iphone smartphone algorithm data developer cybersecurity",
+    "science": "physics chemistry biology quantum space universe planet evolution climate experiment research dna",
+    "business": "business startup marketing sales management leadership entrepreneur brand strategy company career",
+    "finance": "money invest investing stock stocks budget tax loan crypto bitcoin savings retirement bank credit",
+    "health": "health diet nutrition sleep disease mental stress vitamin doctor symptoms immune anxiety",
+    "fitness": "workout exercise gym muscle running cardio strength yoga training weight fitness",
+    "cooking": "recipe cook cooking bake baking food kitchen pasta chicken dessert bread vegan meal",
+    "travel": "travel trip destination flight hotel visa beach tour itinerary backpacking city country",
+    "education": "learn learning study exam school university college students teacher course skills",
+    "lifestyle": "home habits productivity fashion beauty relationship parenting minimalism hobby garden",
+    "entertainment": "movie movies film music song game games gaming series anime book books netflix",
+    "sports": "football cricket soccer basketball tennis olympics nba league player match team",
+    "history": "history ancient war empire medieval civilization revolution historical century",
+}
+SEED_WEIGHT = 3
+
+def normalize_category(raw: Optional[str]) -> Optional[str]:
+    """Map a free-form category answer ("Tech.", "technology") onto CATEGORIES, or None."""
+    if not raw:
+        return None
+    word = re.sub(r"[^a-z]", "", raw.strip().lower())
+    if word in CATEGORIES:
+        return word
+    return ALIASES.get(word)
+
+class CategoryClassifier:
+    """TF-IDF keyword model over topic words, trained from seed keywords and stored blogs."""
+
+    def __init__(self, min_confidence: float = None):
+        self.min_confidence = settings.CATEGORY_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+        self._index: Dict[str, List[Tuple[str, float]]] = {}
+        self._dirty = True
+        for category, words in SEED_KEYWORDS.items():
+            self._counts[category].update({word: SEED_WEIGHT for word in words.split()})
+
+    def learn(self, topic: str, category: Optional[str]):
+        category = normalize_category(category)
+        if category and category != "general":
+            self._counts[category].update(tokenize(topic))
+            self._dirty = True
+
+    def train(self, rows: Iterable[Tuple[str, Optional[str]]]):
+        for topic, category in rows:
+            self.learn(topic, category)
+
+    async def load(self, db):
+        result = await db.execute(select(Blog.query, Blog.category).where(Blog.category.isnot(None)))
+        self.train(result.all())
+
+    def _build(self):
+        document_frequency = Counter()
+        for counts in self._counts.values():
+            document_frequency.update(counts.keys())
+        total_categories = len(self._counts)
+        index = defaultdict(list)
+        for category, counts in self._counts.items():
+            total = sum(counts.values())
+            for term, count in counts.items():
+                weight = (count / total) * (math.log(total_categories / document_frequency[term]) + 1.0)
+                index[term].append((category, weight))
+        # Term -> [(category, weight)] so scoring only touches the topic's own words
+        self._index = dict(index)
+        self._dirty = False
+
+    def classify(self, topic: str) -> Tuple[Optional[str], float]:
+        """Return (category, confidence).
+
+        Confidence is the winner's share of all category scores times the share of the
+        topic's words that point to it, so "python snake care" (one tech word of three)
+        is not trusted just because nothing else matched.
+        """
+        if self._dirty:
+            self._build()
+        tokens = tokenize(topic)
+        scores = Counter()
+        matched = Counter()
+        for token in tokens:
+            for category, weight in self._index.get(token, ()):
+                scores[category] += weight
+                matched[category] += 1
+        if not scores:
+            return None, 0.0
+        category, best = scores.most_common(1)[0]
+        return category, (best / sum(scores.values())) * (matched[category] / len(tokens))
+
+    def predict(self, topic: str) -> Optional[str]:
+        """The category if the model is confident enough, else None (caller should ask the LLM)."""
+        category, confidence = self.classify(topic)
+        return category if confidence >= self.min_confidence else None
+
+category_classifier = CategoryClassifier()
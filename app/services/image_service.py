@@ -1,36 +1,83 @@
-import requests
-from typing import Optional
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
 from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..core.write_behind import WriteBehind
+from .image_store import image_store
+from .providers import TogetherImageProvider
+from .response_cache import normalize_prompt
 from models import ImageUrl
 
+logger = logging.getLogger(__name__)
+
+# (upstream link, local file path or None)
+Image = Tuple[str, Optional[str]]
+
+# Image records are written in batches after the reply is queued
+image_writes = WriteBehind(
+    "image_urls", ImageUrl,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    interval=settings.WRITE_BEHIND_INTERVAL,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+)
+
 class ImageService:
     def __init__(self):
-        self.together_url = "https://api.together.xyz/v1/images/generations"
+        self.together = TogetherImageProvider()
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
 
-    async def generate_image(self, prompt: str, user: str, chat_id: int, db: AsyncSession) -> Optional[str]:
+    async def generate_image(self, prompt: str, user: str, chat_id: int, db: AsyncSession) -> Optional[Image]:
+        """Reuse the last image generated for the same normalized prompt, else generate one."""
+        key = normalize_prompt(prompt)[:255]
         try:
-            headers = {
-                "Authorization": f"Bearer {settings.TOGETHER_API_KEY}",
-                "Content-Type": "application/json"
-            }
-            payload = {
-                "model": "black-forest-labs/FLUX.1-schnell-Free",
-                "prompt": prompt,
-                "width": 432,
-                "height": 768
-            }
-            
-            response = requests.post(self.together_url, json=payload, headers=headers)
-            if response.ok:
-                image_url = response.json()["data"][0]["url"]
-                await self._save_image_record(user, prompt, image_url, chat_id, db)
-                return image_url
+            cached = await self._find_cached(db, key)
+            if cached is not None:
+                self.hits += 1
+                link, content_hash, path = cached
+            else:
+                self.misses += 1
+                # Nothing else needs the session; don't hold a pooled connection during generation
+                await db.close()
+                # Identical prompts arriving together share one upstream call; the key only
+                # dedups and caches, the model gets the prompt as the user wrote it
+                link, content_hash = await self._flights.do(key, lambda: self._generate(prompt))
+                path = await image_store.path(content_hash)
+            self._save_image_record(user, key, link, content_hash, chat_id)
+            return link, path
+        except Exception as e:
+            logger.error(f"Image generation failed for '{key}': {e}")
             return None
-        except Exception:
+
+    async def _find_cached(self, db: AsyncSession, key: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        result = await db.execute(
+            select(ImageUrl.link, ImageUrl.content_hash, ImageUrl.createdOn)
+            .where(ImageUrl.query == key)
+            .order_by(ImageUrl.id.desc())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
             return None
+        path = await image_store.path(row.content_hash)
+        if path is not None:
+            return row.link, row.content_hash, path
+        # Without a local copy the upstream link is only good until it expires
+        if row.createdOn and row.createdOn > datetime.utcnow() - timedelta(seconds=settings.IMAGE_LINK_TTL):
+            return row.link, None, None
+        return None
+
+    async def _generate(self, prompt: str) -> Tuple[str, Optional[str]]:
+        link = await self.together.generate_image(prompt, width=432, height=768)
+        content_hash = await image_store.download(link)
+        return link, content_hash
 
-    async def _save_image_record(self, user: str, query: str, link: str, chat_id: int, db: AsyncSession):
-        new_entry = ImageUrl(user=user, query=query, link=link, chat_id=chat_id)
-        db.add(new_entry)
-        await db.commit()
\ No newline at end of file
+    @staticmethod
+    def _save_image_record(user: str, query: str, link: str, content_hash: Optional[str], chat_id: int):
+        image_writes.add(dict(user=user, query=query, link=link, content_hash=content_hash, chat_id=chat_id,
+                              createdOn=datetime.utcnow()))
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from ..core.config import settings
+from ..core.http import http_clients
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+class ImageStore:
+    """Content-addressed image files on local disk, evicted least-recently-used past a size cap.
+
+    Files live at <root>/<sha256[:2]>/<sha256><ext>. Recency is kept in the file's
+    mtime, so it survives restarts; each worker tracks the total size it has seen
+    and rescans the directory the first time it is used.
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = None, max_image_bytes: int = None):
+        self.root = settings.IMAGE_STORE_DIR if root is None else root
+        self.max_bytes = settings.IMAGE_STORE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_image_bytes = settings.IMAGE_MAX_BYTES if max_image_bytes is None else max_image_bytes
+        self._files: "OrderedDict[str, tuple]" = OrderedDict()  # hash -> (path, size), oldest first
+        self._total = 0
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _scan(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.startswith("."):
+                    continue  # partial downloads
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, os.path.splitext(filename)[0], path, stat.st_size))
+        entries.sort()
+        self._files = OrderedDict((digest, (path, size)) for _, digest, path, size in entries)
+        self._total = sum(size for _, _, _, size in entries)
+
+    async def _ensure_loaded(self):
+        if not self._loaded:
+            os.makedirs(self.root, exist_ok=True)
+            await asyncio.to_thread(self._scan)
+            self._loaded = True
+
+    async def path(self, digest: str) -> Optional[str]:
+        """Local path for a stored image, marking it recently used; None if evicted."""
+        if not self.enabled or not digest:
+            return None
+        await self._ensure_loaded()
+        entry = self._files.get(digest)
+        if entry is None:
+            return None
+        path = entry[0]
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker
+            self._total -= self._files.pop(digest)[1]
+            return None
+        self._files.move_to_end(digest)
+        return path
+
+    async def download(self, url: str) -> Optional[str]:
+        """Stream the image at `url` to disk and return its sha256; None on failure or if oversized."""
+        if not self.enabled:
+            return None
+        await self._ensure_loaded()
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = os.path.join(self.root, f".download-{os.getpid()}-{id(digest)}")
+        try:
+            async with http_clients.get("images").stream("GET", url) as response:
+                response.raise_for_status()
+                extension = EXTENSIONS.get(response.headers.get("content-type", "").split(";")[0], ".img")
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise ValueError(f"image larger than {self.max_image_bytes} bytes")
+                        digest.update(chunk)
+                        f.write(chunk)
+        except Exception as e:
+            logger.error(f"Image download failed for {url}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+        key = digest.hexdigest()
+        path = os.path.join(self.root, key[:2], key + extension)
+        existing = self._files.get(key)
+        if existing is not None and os.path.exists(existing[0]):
+            os.remove(tmp_path)
+            os.utime(existing[0])
+            self._files.move_to_end(key)
+            return key
+        if existing is not None:
+            self._total -= existing[1]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        self._files[key] = (path, size)
+        self._files.move_to_end(key)
+        self._total += size
+        self._evict()
+        return key
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._files) > 1:
+            digest, (path, size) = self._files.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            logger.info(f"Evicted cached image {digest} ({size} bytes)")
+
+image_store = ImageStore()
@@ -0,0 +1,370 @@
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from ..core.circuit_breaker import CircuitBreaker
+from ..core.config import settings
+from ..core.http import http_clients
+from ..core.metrics import LLM_ERRORS, LLM_FAILOVERS, LLM_HEDGES, LLM_REQUEST_DURATION, LLM_TOKENS
+
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+
+class Provider:
+    """Base for upstream AI providers: caps in-flight calls and bounds each call's duration."""
+
+    name = "provider"
+
+    def __init__(self, max_concurrency: int, timeout: float):
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _limited(self, coro, operation: str, on_latency: Callable[[float], None] = None):
+        """Run one upstream call; on success `on_latency` gets its duration, excluding the wait for a slot."""
+        async with self._semaphore:
+            # Timed inside the semaphore so queueing for a slot isn't counted as upstream latency
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(coro, self.timeout)
+                if on_latency is not None:
+                    on_latency(time.perf_counter() - started)
+                return result
+            except Exception as e:
+                LLM_ERRORS.inc(self.name, type(e).__name__)
+                raise
+            finally:
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - started, self.name, operation)
+
+    def _record_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        if prompt_tokens:
+            LLM_TOKENS.inc(self.name, "prompt", amount=prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.inc(self.name, "completion", amount=completion_tokens)
+
+class TextProvider(Provider):
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.7,
+                       json_mode: bool = False, on_latency: Callable[[float], None] = None) -> str:
+        """Return the completion text; with json_mode the provider is asked for a JSON object."""
+        return await self._limited(
+            self._complete(prompt, max_tokens, temperature, json_mode), "complete", on_latency
+        )
+
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> str:
+        raise NotImplementedError
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Yield completion text as it arrives; the timeout bounds the whole stream."""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            started = time.perf_counter()
+            deadline = loop.time() + self.timeout
+            chunks = self._stream(prompt, max_tokens, temperature)
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if chunk:
+                        yield chunk
+            except Exception as e:
+                LLM_ERRORS.inc(self.name, type(e).__name__)
+                raise
+            finally:
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - started, self.name, "stream")
+                await chunks.aclose()
+
+    def _stream(self, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+class OpenAIProvider(TextProvider):
+    name = "openai"
+
+    def __init__(self):
+        super().__init__(settings.OPENAI_MAX_CONCURRENCY, settings.OPENAI_TIMEOUT)
+        self.model = settings.OPENAI_MODEL
+        self._client: Optional["openai.AsyncOpenAI"] = None
+
+    @property
+    def client(self) -> "openai.AsyncOpenAI":
+        if self._client is None:
+            # The SDK takes about as long to import as the rest of the app; load it on first call
+            import openai
+            self._client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, timeout=self.timeout
+            )
+        return self._client
+
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> str:
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **kwargs
+        )
+        if response.usage:
+            self._record_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    async def _stream(self, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if chunk.usage:
+                # Sent as a final chunk with no choices
+                self._record_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+            if chunk.choices:
+                yield chunk.choices[0].delta.content
+
+class GeminiProvider(TextProvider):
+    name = "gemini"
+
+    def __init__(self):
+        super().__init__(settings.GEMINI_MAX_CONCURRENCY, settings.GEMINI_TIMEOUT)
+        self.model = settings.GEMINI_MODEL
+        base_url = f"{settings.GEMINI_API_URL}/v1beta/models/{self.model}"
+        self.url = f"{base_url}:generateContent"
+        self.stream_url = f"{base_url}:streamGenerateContent"
+
+    @staticmethod
+    def _request(prompt: str, max_tokens: int, temperature: float, json_mode: bool = False) -> dict:
+        generation_config = {"maxOutputTokens": max_tokens, "temperature": temperature}
+        if json_mode:
+            generation_config["responseMimeType"] = "application/json"
+        return {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": generation_config
+        }
+
+    @staticmethod
+    def _text(result: dict) -> str:
+        return result["candidates"][0]["content"]["parts"][0]["text"]
+
+    def _record_gemini_usage(self, result: dict):
+        usage = result.get("usageMetadata") or {}
+        self._record_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> str:
+        headers = {"Content-Type": "application/json"}
+        params = {"key": settings.GEMINI_API_KEY}
+        json_data = self._request(prompt, max_tokens, temperature, json_mode)
+        response = await http_clients.get("gemini").post(self.url, headers=headers, params=params, json=json_data)
+        response.raise_for_status()
+        result = response.json()
+        self._record_gemini_usage(result)
+        return self._text(result)
+
+    async def _stream(self, prompt: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        headers = {"Content-Type": "application/json"}
+        params = {"key": settings.GEMINI_API_KEY, "alt": "sse"}
+        json_data = self._request(prompt, max_tokens, temperature)
+        async with http_clients.get("gemini").stream(
+            "POST", self.stream_url, headers=headers, params=params, json=json_data
+        ) as response:
+            response.raise_for_status()
+            usage = None
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                # Every event repeats the running totals; only the last one counts
+                usage = event.get("usageMetadata") or usage
+                candidates = event.get("candidates") or [{}]
+                # The final event may carry only a finishReason and no text
+                parts = candidates[0].get("content", {}).get("parts", [])
+                yield "".join(part.get("text", "") for part in parts)
+            if usage:
+                self._record_gemini_usage({"usageMetadata": usage})
+
+class ProviderUnavailable(Exception):
+    """Every text provider's circuit breaker is open."""
+
+def _discard_result(task: asyncio.Task):
+    # Retrieve the outcome of abandoned calls so asyncio doesn't log it as unhandled
+    if not task.cancelled():
+        task.exception()
+
+# Completions up to this many tokens (categorizing, titles) are timed separately from articles
+SHORT_CALL_TOKENS = 256
+
+def call_kind(max_tokens: int) -> str:
+    return "short" if max_tokens <= SHORT_CALL_TOKENS else "long"
+
+# A completion call made against one provider; the callback receives its upstream latency
+Call = Callable[[TextProvider, Callable[[float], None]], Awaitable[str]]
+
+class FailoverProvider:
+    """Ordered text providers behind per-provider circuit breakers.
+
+    Calls go to the first provider whose breaker is closed and move down the list
+    when it fails. With hedging, a call still unanswered after the provider's p95
+    latency is also sent to the next provider, and the first answer wins. Streams
+    fail over only before the first chunk, so readers never get a mix of two articles.
+    """
+
+    def __init__(self, providers: List[TextProvider], hedge: bool = False):
+        self.providers = providers
+        self.hedge = hedge
+        self.name = "+".join(provider.name for provider in providers)
+        self.model = "+".join(provider.model for provider in providers)
+        self.breakers: Dict[str, CircuitBreaker] = {
+            provider.name: CircuitBreaker(
+                window=settings.LLM_BREAKER_WINDOW,
+                min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                slow_call={"short": settings.LLM_BREAKER_SLOW_CALL_SHORT, "long": settings.LLM_BREAKER_SLOW_CALL},
+                slow_rate=settings.LLM_BREAKER_SLOW_RATE,
+                cooldown=settings.LLM_BREAKER_COOLDOWN,
+            )
+            for provider in providers
+        }
+
+    async def complete(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.7,
+                       json_mode: bool = False) -> str:
+        call = lambda provider, on_latency: provider.complete(prompt, max_tokens, temperature, json_mode, on_latency)
+        kind = call_kind(max_tokens)
+        if self.hedge:
+            return await self._hedged(call, kind)
+        return await self._failover(call, kind)
+
+    async def _attempt(self, provider: TextProvider, call: Call, kind: str) -> str:
+        breaker = self.breakers[provider.name]
+        # Upstream time only: waiting for one of our own slots says nothing about the provider's health
+        latencies = []
+        try:
+            result = await call(provider, latencies.append)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(latencies[0] if latencies else None, kind)
+        return result
+
+    async def _failover(self, call: Call, kind: str) -> str:
+        last_error = None
+        for provider in self.providers:
+            if not self.breakers[provider.name].allow():
+                continue
+            try:
+                return await self._attempt(provider, call, kind)
+            except Exception as e:
+                last_error = e
+                LLM_FAILOVERS.inc(provider.name)
+                logger.warning(f"{provider.name} failed ({type(e).__name__}: {e}), trying the next provider")
+        raise last_error or ProviderUnavailable("every AI provider's circuit is open")
+
+    def _hedge_delay(self, provider: TextProvider, kind: str) -> float:
+        p95 = self.breakers[provider.name].p95(kind)
+        if p95 is None:
+            return settings.LLM_HEDGE_DEFAULT_DELAY
+        return max(settings.LLM_HEDGE_MIN_DELAY, p95)
+
+    async def _hedged(self, call: Call, kind: str) -> str:
+        remaining = iter(self.providers)
+        pending: Dict[asyncio.Future, TextProvider] = {}
+        last_error = None
+
+        def launch() -> bool:
+            for provider in remaining:
+                if self.breakers[provider.name].allow():
+                    pending[asyncio.ensure_future(self._attempt(provider, call, kind))] = provider
+                    return True
+            return False
+
+        can_hedge = launch()
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1 and can_hedge:
+                    timeout = self._hedge_delay(next(iter(pending.values())), kind)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    slow = next(iter(pending.values()))
+                    can_hedge = launch()
+                    if can_hedge:
+                        LLM_HEDGES.inc(slow.name)
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+                        LLM_FAILOVERS.inc(provider.name)
+                        logger.warning(f"{provider.name} failed ({type(e).__name__}: {e}), trying the next provider")
+                if not pending:
+                    can_hedge = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_discard_result)
+        raise last_error or ProviderUnavailable("every AI provider's circuit is open")
+
+    async def stream(self, prompt: str, max_tokens: int = 2000, temperature: float = 0.7) -> AsyncIterator[str]:
+        last_error = None
+        for provider in self.providers:
+            breaker = self.breakers[provider.name]
+            if not breaker.allow():
+                continue
+            chunks = provider.stream(prompt, max_tokens, temperature)
+            started = False
+            try:
+                async for chunk in chunks:
+                    started = True
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                if started:
+                    raise
+                last_error = e
+                LLM_FAILOVERS.inc(provider.name)
+                logger.warning(f"{provider.name} stream failed ({type(e).__name__}: {e}), trying the next provider")
+                continue
+            finally:
+                await chunks.aclose()
+            breaker.record_success()
+            return
+        raise last_error or ProviderUnavailable("every AI provider's circuit is open")
+
+class TogetherImageProvider(Provider):
+    name = "together"
+
+    def __init__(self):
+        super().__init__(settings.TOGETHER_MAX_CONCURRENCY, settings.TOGETHER_TIMEOUT)
+        self.url = f"{settings.TOGETHER_API_URL}/v1/images/generations"
+        self.model = "black-forest-labs/FLUX.1-schnell-Free"
+
+    async def generate_image(self, prompt: str, width: int = 432, height: int = 768) -> str:
+        return await self._limited(self._generate_image(prompt, width, height), "image")
+
+    async def _generate_image(self, prompt: str, width: int, height: int) -> str:
+        headers = {
+            "Authorization": f"Bearer {settings.TOGETHER_API_KEY}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "width": width,
+            "height": height
+        }
+        response = await http_clients.get("together").post(self.url, json=payload, headers=headers)
+        response.raise_for_status()
+        return response.json()["data"][0]["url"]
@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Optional
+from jinja2 import Environment
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+from ..core.http_cache import CachedPage, record_etag
+from models import Blog
+
+def render_markdown(content: str) -> str:
+    # Imported on first use: most requests serve pre-rendered HTML
+    from markdown import markdown
+    return markdown(content)
+
+def render_blog_page(env: Environment, blog: Blog) -> str:
+    html = blog.html if blog.html is not None else render_markdown(blog.content)
+    return env.get_template("blog.html").render(content=html, error=None, title=blog.title)
+
+def render_home_page(env: Environment, blogs_by_category: dict) -> str:
+    return env.get_template("blogs.html").render(blogs_by_category=blogs_by_category, datetime=datetime)
+
+def render_category_page(env: Environment, category: str, blogs, current_page: int, total_pages: int,
+                         next_cursor: Optional[str]) -> str:
+    return env.get_template("category_blogs.html").render(
+        blogs=blogs,
+        category=category,
+        current_page=current_page,
+        total_pages=total_pages,
+        next_cursor=next_cursor
+    )
+
+def render_search_page(env: Environment, query: str, results) -> str:
+    return env.get_template("search.html").render(query=query, results=results)
+
+def blog_etag(blog: Blog) -> str:
+    return record_etag("blog", blog.id, blog.created_at)
+
+class RenderService:
+    """Caches fully rendered blog pages by Blog.id, plus a topic key -> id alias.
+
+    Listing pages (home, categories) change whenever a blog is added, so they are
+    cached separately and dropped by invalidate_listings(). The TTL bounds how
+    stale they can get when another worker inserted the blog.
+    """
+
+    def __init__(self, env: Environment, maxsize: int = None):
+        maxsize = maxsize or settings.PAGE_CACHE_SIZE
+        self.env = env
+        self.pages = LRUCache(maxsize)
+        self._ids = LRUCache(maxsize)
+        self.listings = LRUCache(maxsize, ttl=settings.LISTING_CACHE_TTL)
+        self._listing_version = 0
+
+    def cached_page(self, key: str) -> Optional[CachedPage]:
+        blog_id = self._ids.get(key)
+        if blog_id is None:
+            return None
+        return self.pages.get(blog_id)
+
+    def blog_page(self, key: str, blog: Blog) -> CachedPage:
+        if blog.id is None:
+            # Generated but not written yet; cached on a later request once it has an id
+            return CachedPage(render_blog_page(self.env, blog))
+        page = self.pages.get(blog.id)
+        if page is None:
+            page = CachedPage(render_blog_page(self.env, blog), blog_etag(blog), blog.created_at)
+            self.pages.set(blog.id, page)
+        self._ids.set(key, blog.id)
+        return page
+
+    def listing_version(self) -> int:
+        return self._listing_version
+
+    def cached_listing(self, key: str) -> Optional[CachedPage]:
+        return self.listings.get(key)
+
+    def store_listing(self, key: str, page: CachedPage, version: int):
+        # Skip pages rendered from data read before the latest invalidation
+        if version == self._listing_version:
+            self.listings.set(key, page)
+
+    def invalidate_listings(self, blog: Blog = None):
+        self._listing_version += 1
+        self.listings.clear()
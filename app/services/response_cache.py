@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.singleflight import SingleFlight
+from models import ResponseCache as ResponseCacheRow
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive, ignoring trailing punctuation: "Hi!" == "hi"."""
+    return " ".join(prompt.lower().split()).strip(" .!?")
+
+class ResponseCache:
+    """LRU+TTL cache of chat replies keyed on provider, model and normalized prompt.
+
+    With RESPONSE_CACHE_PERSIST the entries are also stored in the response_cache
+    table, so they survive restarts and are shared between workers.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: int = None, persist: bool = None):
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.persist = settings.RESPONSE_CACHE_PERSIST if persist is None else persist
+        self._memory = LRUCache(maxsize or settings.RESPONSE_CACHE_SIZE, ttl=self.ttl)
+        self._pending: Set[asyncio.Task] = set()
+        self._inflight = SingleFlight()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._miss_latency: Optional[float] = None
+
+    @staticmethod
+    def make_key(prompt: str, provider: str, model: str) -> str:
+        return hashlib.sha256(f"{provider}\0{model}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    async def get_or_compute(self, prompt: str, provider: str, model: str,
+                             compute: Callable[[], Awaitable[str]]) -> str:
+        key = self.make_key(prompt, provider, model)
+        response = await self._get(key)
+        if response is not None:
+            self.hits += 1
+            if self._miss_latency is not None:
+                self.saved_seconds += self._miss_latency
+            return response
+
+        self.misses += 1
+        # Identical prompts arriving together share one upstream call
+        return await self._inflight.do(key, lambda: self._compute(key, prompt, provider, model, compute))
+
+    async def _compute(self, key: str, prompt: str, provider: str, model: str,
+                       compute: Callable[[], Awaitable[str]]) -> str:
+        started = time.perf_counter()
+        response = await compute()
+        elapsed = time.perf_counter() - started
+        # Moving average of upstream latency, used to estimate time saved by hits
+        self._miss_latency = elapsed if self._miss_latency is None else 0.9 * self._miss_latency + 0.1 * elapsed
+
+        if response and not response.startswith("⚠️"):
+            self._memory.set(key, response)
+            if self.persist:
+                task = asyncio.ensure_future(self._store(key, provider, model, prompt, response))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+        return response
+
+    async def _get(self, key: str) -> Optional[str]:
+        response = self._memory.get(key)
+        if response is not None or not self.persist:
+            return response
+        try:
+            async with SessionLocal() as db:
+                result = await db.execute(
+                    select(ResponseCacheRow.response)
+                    .where(ResponseCacheRow.key == key)
+                    .where(ResponseCacheRow.created_at >= datetime.utcnow() - timedelta(seconds=self.ttl))
+                )
+                response = result.scalar_one_or_none()
+        except Exception as e:
+            logger.error(f"Response cache lookup failed: {e}")
+            return None
+        if response is not None:
+            self.db_hits += 1
+            self._memory.set(key, response)
+        return response
+
+    async def _store(self, key: str, provider: str, model: str, prompt: str, response: str):
+        try:
+            async with SessionLocal() as db:
+                existing = await db.execute(select(ResponseCacheRow).where(ResponseCacheRow.key == key))
+                row = existing.scalar_one_or_none()
+                if row:
+                    # Refresh an expired entry in place
+                    row.response = response
+                    row.created_at = datetime.utcnow()
+                else:
+                    db.add(ResponseCacheRow(key=key, provider=provider, model=model, prompt=prompt, response=response))
+                await db.commit()
+        except IntegrityError:
+            pass  # another worker stored the same prompt first
+        except Exception as e:
+            logger.error(f"Response cache store failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._memory),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "upstream_calls_saved": self.hits,
+            "seconds_saved": round(self.saved_seconds, 3),
+        }
+
+response_cache = ResponseCache()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import math
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy.future import select
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.text import stem, tokenize
+from models import Blog
+
+logger = logging.getLogger(__name__)
+
+def search_terms(text: str) -> List[str]:
+    return [stem(token) for token in tokenize(text)]
+
+class SearchDoc(NamedTuple):
+    id: int
+    query: str
+    title: str
+    category: Optional[str]
+    created_at: Optional[datetime]
+
+class SearchIndex:
+    """In-process inverted index over Blog title and content, ranked with BM25.
+
+    New posts from this worker are added as they are created; posts written by
+    other workers are picked up by refresh(), which loads ids above the highest one
+    it has read plus any it has not indexed in the REFRESH_ID_OVERLAP ids below it.
+    """
+
+    k1 = 1.5
+    b = 0.75
+    title_boost = 3
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: Dict[int, int] = {}
+        self._docs: Dict[int, SearchDoc] = {}
+        self._total_length = 0
+        # Highest id read by refresh(). Posts added locally don't move it: another worker
+        # may still insert a row with a lower id than theirs.
+        self.loaded_id = 0
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, blog_id: int, query: str, title: str, category: Optional[str],
+            created_at: Optional[datetime], content: str):
+        if blog_id in self._docs:
+            return
+        terms = defaultdict(int)
+        for term in search_terms(title):
+            terms[term] += self.title_boost
+        for term in search_terms(content):
+            terms[term] += 1
+        for term, frequency in terms.items():
+            self._postings[term][blog_id] = frequency
+        length = sum(terms.values())
+        self._lengths[blog_id] = length
+        self._total_length += length
+        self._docs[blog_id] = SearchDoc(blog_id, query, title, category, created_at)
+
+    def add_blog(self, blog: Blog):
+        self.add(blog.id, blog.query, blog.title, blog.category, blog.created_at, blog.content)
+
+    def search(self, text: str, limit: int = 20) -> List[Tuple[SearchDoc, float]]:
+        if not self._docs:
+            return []
+        total_docs = len(self._docs)
+        average_length = self._total_length / total_docs
+        scores = defaultdict(float)
+        for term in set(search_terms(text)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for blog_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[blog_id] / average_length)
+                scores[blog_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self._docs[blog_id], score) for blog_id, score in ranked]
+
+    async def refresh(self, batch_size: int = 200):
+        async with self._lock:
+            async with SessionLocal() as db:
+                # A lower id can commit after a higher one was read; only ids are fetched
+                # for the window, and content just for the rows it turns out to be missing
+                result = await db.execute(
+                    select(Blog.id)
+                    .where(Blog.id > self.loaded_id - settings.REFRESH_ID_OVERLAP, Blog.id <= self.loaded_id)
+                )
+                missed = [blog_id for blog_id in result.scalars() if blog_id not in self._docs]
+                if missed:
+                    result = await db.execute(
+                        select(Blog.id, Blog.query, Blog.title, Blog.category, Blog.created_at, Blog.content)
+                        .where(Blog.id.in_(missed))
+                    )
+                    for row in result.all():
+                        self.add(row.id, row.query, row.title, row.category, row.created_at, row.content)
+
+                while True:
+                    result = await db.execute(
+                        select(Blog.id, Blog.query, Blog.title, Blog.category, Blog.created_at, Blog.content)
+                        .where(Blog.id > self.loaded_id)
+                        .order_by(Blog.id)
+                        .limit(batch_size)
+                    )
+                    rows = result.all()
+                    for row in rows:
+                        self.add(row.id, row.query, row.title, row.category, row.created_at, row.content)
+                        self.loaded_id = row.id
+                    if len(rows) < batch_size:
+                        break
+                    # Let requests run between batches while a large index builds
+                    await asyncio.sleep(0)
+            self._refreshed_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        if time.monotonic() - self._refreshed_at >= settings.SEARCH_REFRESH_INTERVAL:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Search index refresh failed: {e}")
+
+search_index = SearchIndex()
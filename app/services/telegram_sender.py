@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+from ..core.http import http_clients
+from ..core.metrics import TELEGRAM_DELIVERY_DURATION, TELEGRAM_RETRIES, TELEGRAM_SEND_DURATION, TELEGRAM_SENDS
+from ..core.rate_limit import TokenBucket
+from ..core.work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT, separators=("\n\n", "\n", " ")) -> List[str]:
+    """Split text into Telegram-sized parts on paragraph, then line, then word boundaries."""
+    if len(text) <= limit:
+        return [text]
+    index = next((i for i, separator in enumerate(separators) if separator in text), None)
+    if index is None:
+        return [text[start:start + limit] for start in range(0, len(text), limit)]
+
+    separator = separators[index]
+    parts, current = [], ""
+    for piece in text.split(separator):
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current.strip():
+            parts.append(current)
+        current = ""
+        if len(piece) <= limit:
+            current = piece
+        else:
+            parts.extend(split_message(piece, limit, separators[index + 1:]))
+    if current.strip():
+        parts.append(current)
+    return parts
+
+# (method, payload, path of a file to upload as "photo" or None)
+Request = Tuple[str, dict, Optional[str]]
+
+class TelegramSender:
+    """Queued Bot API sends, paced by a token bucket per bot and one per chat.
+
+    Telegram allows roughly 30 messages/second per bot and about one per second
+    in a single chat. 429 answers are retried after their retry_after, and 5xx or
+    network errors with backoff, up to TELEGRAM_MAX_RETRIES times. The parts of one
+    reply are sent in order by a single worker.
+    """
+
+    def __init__(self):
+        self.queue = WorkQueue(
+            "telegram-sends",
+            self._deliver,
+            maxsize=settings.TELEGRAM_SEND_QUEUE_SIZE,
+            workers=settings.TELEGRAM_SEND_WORKERS,
+        )
+        self._bot_buckets = LRUCache(1024)
+        self._chat_buckets = LRUCache(settings.TELEGRAM_CHAT_BUCKETS)
+        self.delivered = 0
+        self.undelivered = 0
+        self.retries = 0
+
+    def start(self):
+        self.queue.start()
+
+    async def stop(self, drain_timeout: float):
+        await self.queue.stop(drain_timeout)
+
+    def send_message(self, token: str, chat_id: int, text: str) -> bool:
+        """Queue a text reply, split into several messages if needed; False if the queue is full."""
+        requests = [("sendMessage", {"chat_id": chat_id, "text": part}, None) for part in split_message(text)]
+        return self.queue.submit((token, chat_id, requests, time.perf_counter()))
+
+    def send_photo(self, token: str, chat_id: int, caption: str, url: str = None, path: str = None) -> bool:
+        """Queue a photo given by URL, or by a local file that is uploaded."""
+        payload = {"chat_id": chat_id, "caption": caption}
+        if path is None:
+            payload["photo"] = url
+        return self.queue.submit((token, chat_id, [("sendPhoto", payload, path)], time.perf_counter()))
+
+    def _bucket(self, cache: LRUCache, key, rate: float, capacity: float) -> TokenBucket:
+        bucket = cache.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            cache.set(key, bucket)
+        return bucket
+
+    async def _deliver(self, item: Tuple[str, int, List[Request], float]):
+        token, chat_id, requests, enqueued = item
+        for method, payload, path in requests:
+            if not await self._send(token, chat_id, method, payload, path):
+                self.undelivered += 1
+                logger.error(f"Failed to deliver {method} to chat {chat_id}")
+                return
+        self.delivered += 1
+        TELEGRAM_DELIVERY_DURATION.observe(time.perf_counter() - enqueued)
+
+    async def _send(self, token: str, chat_id: int, method: str, payload: dict, path: Optional[str]) -> bool:
+        chat_bucket = self._bucket(self._chat_buckets, (token, chat_id),
+                                   settings.TELEGRAM_CHAT_RATE, settings.TELEGRAM_CHAT_BURST)
+        bot_bucket = self._bucket(self._bot_buckets, token, settings.TELEGRAM_RATE, settings.TELEGRAM_RATE)
+        for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+            # Chat first, so a slow chat doesn't sit on tokens other chats could use
+            await chat_bucket.acquire()
+            await bot_bucket.acquire()
+            retry_after = await self._post(token, method, payload, path)
+            if retry_after is None:
+                return True
+            if retry_after < 0 or retry_after > settings.TELEGRAM_MAX_RETRY_AFTER:
+                return False
+            if attempt == settings.TELEGRAM_MAX_RETRIES:
+                return False
+            self.retries += 1
+            TELEGRAM_RETRIES.inc(method)
+            await asyncio.sleep(retry_after or settings.TELEGRAM_RETRY_BACKOFF * 2 ** attempt)
+        return False
+
+    async def _post(self, token: str, method: str, payload: dict, path: Optional[str]) -> Optional[float]:
+        """One Bot API call: None on success, else the retry_after to honor (0 = back off, -1 = give up)."""
+        url = f"{settings.TELEGRAM_API_URL}/bot{token}/{method}"
+        started = time.perf_counter()
+        try:
+            if path:
+                # Uploads go as multipart with the other fields as form data
+                with open(path, "rb") as f:
+                    photo = f.read()
+                response = await http_clients.get("telegram").post(
+                    url, data=payload, files={"photo": (os.path.basename(path), photo)}
+                )
+            else:
+                response = await http_clients.get("telegram").post(url, json=payload)
+            response.raise_for_status()
+            TELEGRAM_SENDS.inc(method, "ok")
+            return None
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            TELEGRAM_SENDS.inc(method, str(status))
+            logger.error(f"Telegram API Error: {e}")
+            if status == 429:
+                return self._retry_after(e.response)
+            return 0.0 if status >= 500 else -1
+        except httpx.HTTPError as e:
+            TELEGRAM_SENDS.inc(method, "transport_error")
+            logger.error(f"Telegram API Error: {e}")
+            return 0.0
+        except OSError as e:
+            TELEGRAM_SENDS.inc(method, "file_error")
+            logger.error(f"Telegram upload failed, can't read {path}: {e}")
+            return -1
+        finally:
+            TELEGRAM_SEND_DURATION.observe(time.perf_counter() - started, method)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("retry-after", 1))
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            self.queue.stats(),
+            delivered=self.delivered,
+            undelivered=self.undelivered,
+            retries=self.retries,
+        )
+
+telegram_sender = TelegramSender()
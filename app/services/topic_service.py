@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from sqlalchemy.future import select
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.text import NEGATIONS, OPPOSITES, STOPWORDS, stem, tokenize
+from models import Blog
+
+logger = logging.getLogger(__name__)
+
+def canonical_topic(topic: str) -> str:
+    """Order- and punctuation-insensitive form: "Decorators in Python?" -> "decorator in python".
+
+    Stopwords are dropped except the directional and comparative ones in OPPOSITES,
+    so "before a workout" and "after a workout" stay apart.
+    """
+    tokens = tokenize(topic, drop_stopwords=False)
+    return " ".join(sorted({stem(token) for token in tokens if token not in STOPWORDS or token in OPPOSITES}))
+
+def exact_tokens(canonical: str) -> Set[str]:
+    """Tokens a fuzzy match must share exactly: numbers ("python 3.11" vs "3.12") and negations."""
+    return {token for token in canonical.split() if token in NEGATIONS or any(c.isdigit() for c in token)}
+
+def contradicts(canonical: str, other: str) -> bool:
+    """True if one side has a word whose opposite is in the other: "up" vs "down", "before" vs "after"."""
+    words = set(other.split())
+    return any(OPPOSITES[token] & words for token in canonical.split() if token in OPPOSITES)
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TopicIndex:
+    """Resolves a requested topic to an existing post's query key.
+
+    Exact canonical matches win; otherwise the closest canonical form by
+    character-trigram Jaccard similarity is returned if it clears the threshold
+    and has the same numbers and negations and no opposite words ("up" vs "down").
+    """
+
+    def __init__(self, threshold: float = None):
+        self.threshold = settings.TOPIC_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self._keys: Dict[str, str] = {}  # canonical -> Blog.query
+        self._grams: Dict[str, Set[str]] = {}  # canonical -> trigrams
+        self._postings: Dict[str, Set[str]] = defaultdict(set)  # trigram -> canonicals
+        # Highest id read by refresh(); local adds don't move it (see SearchIndex.loaded_id).
+        # Each refresh re-reads REFRESH_ID_OVERLAP ids below it for rows that committed late.
+        self.loaded_id = 0
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def add(self, query: str):
+        canonical = canonical_topic(query)
+        if not canonical or canonical in self._keys:
+            return
+        self._keys[canonical] = query
+        grams = trigrams(canonical)
+        self._grams[canonical] = grams
+        for gram in grams:
+            self._postings[gram].add(canonical)
+
+    def add_blog(self, blog: Blog):
+        self.add(blog.query)
+
+    def match(self, topic: str) -> Optional[str]:
+        canonical = canonical_topic(topic)
+        if not canonical:
+            return None
+        exact = self._keys.get(canonical)
+        if exact is not None:
+            return exact
+
+        grams = trigrams(canonical)
+        required = exact_tokens(canonical)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] += 1
+        best, best_score = None, 0.0
+        for candidate, overlap in shared.items():
+            if exact_tokens(candidate) != required or contradicts(canonical, candidate):
+                continue
+            score = overlap / (len(grams) + len(self._grams[candidate]) - overlap)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is not None and best_score >= self.threshold:
+            return self._keys[best]
+        return None
+
+    async def refresh(self, batch_size: int = 1000):
+        async with self._lock:
+            cursor = max(0, self.loaded_id - settings.REFRESH_ID_OVERLAP)
+            async with SessionLocal() as db:
+                while True:
+                    result = await db.execute(
+                        select(Blog.id, Blog.query).where(Blog.id > cursor).order_by(Blog.id).limit(batch_size)
+                    )
+                    rows = result.all()
+                    for row in rows:
+                        # add() ignores topics already indexed
+                        self.add(row.query)
+                        cursor = row.id
+                    self.loaded_id = max(self.loaded_id, cursor)
+                    if len(rows) < batch_size:
+                        break
+            self._refreshed_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        if time.monotonic() - self._refreshed_at >= settings.SEARCH_REFRESH_INTERVAL:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Topic index refresh failed: {e}")
+
+topic_index = TopicIndex()
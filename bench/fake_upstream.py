@@ -0,0 +1,164 @@
+"""Local stand-ins for the OpenAI, Gemini, Together and Telegram APIs.
+
+Each upstream lives under its own prefix (/openai/v1, /gemini, /together, /telegram)
+so one process can serve all of them. Responses are canned and delayed by the
+configured latency; GET /_stats reports how many calls each endpoint received.
+
+    python -m bench.fake_upstream --port 9100 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+ARTICLE = (
+    "# A Practical Guide\n\n"
+    "This article walks through the topic step by step, starting with the basics and moving on to "
+    "the details that matter in practice.\n\n"
+    "## Background\n\n"
+    "Most of the interesting trade-offs only show up once you try things for real, so the examples "
+    "below are kept small and concrete.\n\n"
+    "## Takeaways\n\n"
+    "- Start simple\n- Measure before optimizing\n- Keep what works\n"
+)
+CHUNKS = 20
+IMAGE_BYTES = 64 * 1024
+
+class FakeUpstream:
+    def __init__(self, llm_latency: float, image_latency: float, telegram_latency: float, jitter: float):
+        self.llm_latency = llm_latency
+        self.image_latency = image_latency
+        self.telegram_latency = telegram_latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self.started = time.time()
+
+    async def sleep(self, seconds: float):
+        if seconds > 0:
+            await asyncio.sleep(seconds * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    @staticmethod
+    def reply(prompt: str, json_mode: bool = False) -> str:
+        if prompt.startswith("Categorize"):
+            return "technology"
+        if json_mode:
+            return json.dumps({"category": "technology", "title": "A Practical Guide", "content": ARTICLE})
+        if prompt.startswith("Write a comprehensive blog article"):
+            return ARTICLE
+        return f"Echo: {prompt[:200]}"
+
+    @staticmethod
+    def chunks(text: str):
+        size = max(1, len(text) // CHUNKS)
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    async def stream(self, text: str, encode):
+        parts = self.chunks(text)
+        for part in parts:
+            await self.sleep(self.llm_latency / len(parts))
+            yield encode(part)
+
+def create_app(upstream: FakeUpstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/openai/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        upstream.calls["openai"] += 1
+        prompt = body["messages"][-1]["content"]
+        json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+        text = upstream.reply(prompt, json_mode)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                 "total_tokens": (len(prompt) + len(text)) // 4}
+        common = {"id": "chatcmpl-bench", "created": int(time.time()), "model": body["model"]}
+
+        if body.get("stream"):
+            def encode(part):
+                chunk = dict(common, object="chat.completion.chunk",
+                             choices=[{"index": 0, "delta": {"content": part}, "finish_reason": None}])
+                return f"data: {json.dumps(chunk)}\n\n"
+
+            async def events():
+                async for event in upstream.stream(text, encode):
+                    yield event
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    yield f"data: {json.dumps(dict(common, object='chat.completion.chunk', choices=[], usage=usage))}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await upstream.sleep(upstream.llm_latency)
+        return dict(common, object="chat.completion", usage=usage, choices=[{
+            "index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"
+        }])
+
+    @app.post("/gemini/v1beta/models/{target}")
+    async def gemini_generate(target: str, request: Request):
+        body = await request.json()
+        upstream.calls["gemini"] += 1
+        prompt = body["contents"][0]["parts"][0]["text"]
+        json_mode = body.get("generationConfig", {}).get("responseMimeType") == "application/json"
+        text = upstream.reply(prompt, json_mode)
+        usage = {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+
+        def result(part):
+            return {"candidates": [{"content": {"parts": [{"text": part}], "role": "model"}}], "usageMetadata": usage}
+
+        if target.endswith(":streamGenerateContent"):
+            return StreamingResponse(
+                upstream.stream(text, lambda part: f"data: {json.dumps(result(part))}\n\n"),
+                media_type="text/event-stream"
+            )
+        await upstream.sleep(upstream.llm_latency)
+        return result(text)
+
+    @app.post("/together/v1/images/generations")
+    async def together_image(request: Request):
+        body = await request.json()
+        upstream.calls["together"] += 1
+        await upstream.sleep(upstream.image_latency)
+        image_id = hashlib.sha256(body["prompt"].encode("utf-8")).hexdigest()[:16]
+        return {"data": [{"url": f"{request.base_url}together/files/{image_id}.png"}]}
+
+    @app.get("/together/files/{name}")
+    async def together_file(name: str):
+        upstream.calls["together.files"] += 1
+        # Deterministic bytes per name, roughly the size of a small generated image
+        seed = name.encode("utf-8")
+        return Response(seed * (IMAGE_BYTES // len(seed)), media_type="image/png")
+
+    @app.post("/telegram/bot{token}/{method}")
+    async def telegram_method(token: str, method: str, request: Request):
+        await request.body()
+        upstream.calls[f"telegram.{method}"] += 1
+        await upstream.sleep(upstream.telegram_latency)
+        return JSONResponse({"ok": True, "result": {"message_id": upstream.calls[f"telegram.{method}"]}})
+
+    @app.get("/_stats")
+    async def stats():
+        return {"uptime": round(time.time() - upstream.started, 3), "calls": dict(upstream.calls)}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Gemini/Together/Telegram upstreams")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per completion (spread over stream chunks)")
+    parser.add_argument("--image-latency", type=float, default=1.0)
+    parser.add_argument("--telegram-latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.1, help="Relative +/- spread applied to every delay")
+    args = parser.parse_args()
+
+    import uvicorn
+    upstream = FakeUpstream(args.llm_latency, args.image_latency, args.telegram_latency, args.jitter)
+    uvicorn.run(create_app(upstream), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
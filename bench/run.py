@@ -0,0 +1,279 @@
+"""Benchmark the app against local stand-ins for every upstream.
+
+Seeds a database, starts bench.fake_upstream and the app (uvicorn) as separate
+processes, drives each scenario at each concurrency level and prints a JSON report
+with req/s and latency percentiles.
+
+    python -m bench.run --blogs 2000 --categories 10 --concurrency 1,16,64 --requests 2000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import quote
+
+import httpx
+
+from bench.seed import BOT_NAME, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("home", "category", "post", "post_miss", "webhook")
+
+logger = logging.getLogger("bench")
+
+class Context:
+    """Seeded data plus a run-wide counter so every request gets unique ids and topics."""
+
+    def __init__(self, topics, categories):
+        self.topics = topics
+        self.categories = categories
+        self.sequence = itertools.count(1)
+        self.run_id = random.randrange(10 ** 6)
+
+    @staticmethod
+    def fresh_topic() -> str:
+        # Random words so the near-duplicate topic matcher doesn't redirect to an earlier miss
+        return " ".join("".join(random.choices(string.ascii_lowercase, k=random.randint(6, 9))) for _ in range(3))
+
+    def request(self, scenario: str):
+        i = next(self.sequence)
+        if scenario == "home":
+            return "GET", "/blog/", None
+        if scenario == "category":
+            return "GET", f"/blog/category/{quote(random.choice(self.categories))}", None
+        if scenario == "post":
+            return "GET", f"/blog/post/{quote(random.choice(self.topics))}", None
+        if scenario == "post_miss":
+            return "GET", f"/blog/post/{quote(self.fresh_topic())}", None
+        if scenario == "webhook":
+            return "POST", f"/webhook/{BOT_NAME}", {
+                "update_id": self.run_id * 10 ** 7 + i,
+                "message": {
+                    "message_id": i,
+                    "chat": {"id": 1000 + i % 100},
+                    "from": {"first_name": "Bench"},
+                    # Unique text so the chat reply cache doesn't absorb the load
+                    "text": f"benchmark question {self.run_id}-{i}",
+                },
+            }
+        raise ValueError(f"Unknown scenario {scenario}")
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+async def drive(client: httpx.AsyncClient, ctx: Context, scenario: str, concurrency: int, total: int) -> dict:
+    """Closed loop: `concurrency` workers issue requests back to back until `total` are done."""
+    remaining = iter(range(total))
+    latencies = []
+    statuses = Counter()
+
+    async def worker():
+        for _ in remaining:
+            method, path, body = ctx.request(scenario)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "statuses": dict(statuses),
+        "duration_s": round(duration, 3),
+        "rps": round(total / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+async def sent_replies(upstream_url: str) -> int:
+    async with httpx.AsyncClient() as client:
+        calls = (await client.get(f"{upstream_url}/_stats")).json()["calls"]
+    return calls.get("telegram.sendMessage", 0)
+
+async def wait_for_replies(upstream_url: str, expected: int, timeout: float) -> float:
+    """Webhooks are acknowledged before the reply is sent; wait until the queue has drained."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if await sent_replies(upstream_url) >= expected:
+            break
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - started
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_process(args, env=None, log=None) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", *args], cwd=ROOT, env=env, stdout=log, stderr=log)
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode}")
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def benchmark(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    database_url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}"
+    logger.info(f"Seeding {args.blogs} blogs in {args.categories} categories")
+    topics, categories = await seed(database_url, args.blogs, args.categories)
+
+    upstream_port, app_port = free_port(), free_port()
+    upstream_url = f"http://127.0.0.1:{upstream_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        OPENAI_API_KEY="bench", GEMINI_API_KEY="bench", TOGETHER_API_KEY="bench",
+        OPENAI_BASE_URL=f"{upstream_url}/openai/v1",
+        GEMINI_API_URL=f"{upstream_url}/gemini",
+        TOGETHER_API_URL=f"{upstream_url}/together",
+        TELEGRAM_API_URL=f"{upstream_url}/telegram",
+        USE_GPT="true" if args.provider == "openai" else "false",
+        HTTP2="false",
+    )
+    app_log = open(args.app_log, "a")
+    processes = [
+        start_process(["bench.fake_upstream", "--port", str(upstream_port),
+                       "--llm-latency", str(args.llm_latency), "--image-latency", str(args.image_latency),
+                       "--telegram-latency", str(args.telegram_latency), "--jitter", str(args.jitter)]),
+        start_process(["uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(app_port),
+                       "--workers", str(args.workers), "--log-level", "warning"], env=env, log=app_log),
+    ]
+    try:
+        await wait_ready(f"{upstream_url}/_stats", processes[0])
+        await wait_ready(f"{app_url}/health", processes[1])
+
+        ctx = Context(topics, categories)
+        levels = [int(level) for level in args.concurrency.split(",")]
+        results = []
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client:
+            for scenario in args.scenarios.split(","):
+                for concurrency in levels:
+                    logger.info(f"{scenario} @ {concurrency}")
+                    replies_before = await sent_replies(upstream_url) if scenario == "webhook" else 0
+                    if args.warmup:
+                        warmup = await drive(client, ctx, scenario, concurrency, args.warmup)
+                        if scenario == "webhook":
+                            # Let warmup replies finish so they don't count towards the measured run
+                            expected = replies_before + warmup["statuses"].get("200", 0)
+                            await wait_for_replies(upstream_url, expected, args.timeout)
+                            replies_before = await sent_replies(upstream_url)
+                    result = await drive(client, ctx, scenario, concurrency, args.requests)
+                    if scenario == "webhook":
+                        accepted = result["statuses"].get("200", 0)
+                        result["drain_s"] = round(
+                            await wait_for_replies(upstream_url, replies_before + accepted, args.timeout), 3
+                        )
+                        result["replies_sent"] = await sent_replies(upstream_url) - replies_before
+                    results.append(result)
+    finally:
+        # App first, so in-flight replies don't hit an upstream that is already gone
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        app_log.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "database": database_url.split(":", 1)[0],
+            "blogs": args.blogs,
+            "categories": args.categories,
+            "workers": args.workers,
+            "provider": args.provider,
+            "llm_latency_s": args.llm_latency,
+            "image_latency_s": args.image_latency,
+            "telegram_latency_s": args.telegram_latency,
+            "jitter": args.jitter,
+            "requests_per_level": args.requests,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the blog app against local fake upstreams")
+    parser.add_argument("--blogs", type=int, default=1000, help="Blogs to seed")
+    parser.add_argument("--categories", type=int, default=10, help="Categories to spread them over")
+    parser.add_argument("--database-url", help="Seed this (empty) database instead of a temporary SQLite file")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests before each level")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--provider", choices=("openai", "gemini"), default="openai")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--image-latency", type=float, default=1.0)
+    parser.add_argument("--telegram-latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request and webhook drain timeout")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--app-log", default=os.devnull, help="File for the app's own log output")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", stream=sys.stderr)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(benchmark(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
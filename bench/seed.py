@@ -0,0 +1,56 @@
+"""Create a benchmark database with N blogs spread over M categories."""
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.migrations import schema_fingerprint, store_version, upgrade_schema
+from app.services.category_classifier import CATEGORIES
+from app.services.render_service import render_markdown
+from bench.fake_upstream import ARTICLE
+from models import Blog, BotConfig
+
+BOT_NAME = "bench"
+BOT_TOKEN = "bench-token"
+
+def category_names(count: int):
+    names = list(CATEGORIES[:count])
+    names.extend(f"category{i}" for i in range(len(names), count))
+    return names
+
+def blog_topic(index: int, category: str) -> str:
+    return f"{category} guide number {index}"
+
+async def seed(database_url: str, blogs: int, categories: int, batch_size: int = 500):
+    """Returns the seeded topics and category names so scenarios can request real pages."""
+    engine = create_async_engine(database_url)
+    names = category_names(categories)
+    html = render_markdown(ARTICLE)
+    now = datetime.utcnow()
+    topics = []
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(upgrade_schema)
+            # Stamped like a migrated database, so the app boots without reflecting the schema
+            await conn.run_sync(store_version, schema_fingerprint())
+            await conn.execute(insert(BotConfig).values(name=BOT_NAME, token=BOT_TOKEN))
+            rows = []
+            for i in range(blogs):
+                category = names[i % len(names)]
+                topic = blog_topic(i, category)
+                topics.append(topic)
+                rows.append({
+                    "query": topic,
+                    "title": topic.title(),
+                    "content": ARTICLE,
+                    "html": html,
+                    "category": category,
+                    "created_at": now - timedelta(minutes=i),
+                })
+                if len(rows) >= batch_size:
+                    await conn.execute(insert(Blog), rows)
+                    rows = []
+            if rows:
+                await conn.execute(insert(Blog), rows)
+    finally:
+        await engine.dispose()
+    return topics, names
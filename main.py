@@ -1,29 +1,130 @@
+import time
+_import_started = time.perf_counter()  # reported as the "imports" startup phase
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 from datetime import datetime
 import logging
 
-from app.core.database import engine
-from app.api.blog_routes import router as blog_router
-from app.api.webhook_routes import router as webhook_router
-from models import Base
+from app.core.database import engine, lock_engine, read_engine, write_engine, SessionLocal
+from app.core.config import settings
+from app.core.http import http_clients
+from app.core.metrics import MetricsMiddleware, registry, track_cache
+from app.core.migrations import ensure_schema
+from app.core.startup import startup_timer
+from app.api.blog_routes import router as blog_router, blog_service, render_service
+from app.api.webhook_routes import router as webhook_router, update_queue, bot_service, image_service
+from app.services.ai_service import text_provider
+from app.services.blog_service import blog_writes
+from app.services.image_service import image_writes
+from app.services.category_classifier import category_classifier
+from app.services.response_cache import response_cache
+from app.services.search_service import search_index
+from app.services.telegram_sender import telegram_sender
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Blog Application", version="1.0.0")
+WRITE_BUFFERS = (blog_writes, image_writes)
+
+startup_timer.record("imports", time.perf_counter() - _import_started)
 
-@app.on_event("startup")
-async def startup():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     try:
         logger.info("Starting application...")
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database initialized successfully")
+        with startup_timer.phase("schema"):
+            upgraded = await ensure_schema()
+        logger.info(f"Database initialized successfully ({'upgraded' if upgraded else 'schema current'})")
+        with startup_timer.phase("categories"):
+            async with SessionLocal() as db:
+                await category_classifier.load(db)
+        with startup_timer.phase("http_clients"):
+            await http_clients.start()
+        # Build the search index in the background so it doesn't delay startup
+        app.state.search_index_task = asyncio.create_task(search_index.refresh())
+        for buffer in WRITE_BUFFERS:
+            buffer.start()
+        telegram_sender.start()
+        update_queue.start()
+        logger.info(f"Started in {startup_timer.total * 1000:.0f}ms: {startup_timer.report()}")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
         raise
+    yield
+    # Updates first: draining them queues their replies
+    await update_queue.stop(settings.WEBHOOK_DRAIN_TIMEOUT)
+    await telegram_sender.stop(settings.WEBHOOK_DRAIN_TIMEOUT)
+    # Generations still running add their rows to blog_writes when they finish
+    await blog_service.drain(settings.WEBHOOK_DRAIN_TIMEOUT)
+    for buffer in WRITE_BUFFERS:
+        await buffer.stop(settings.WEBHOOK_DRAIN_TIMEOUT)
+    await http_clients.close()
+    await engine.dispose()
+    await lock_engine.dispose()
+    await write_engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+app = FastAPI(title="Blog Application", version="1.0.0", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+track_cache("blog_pages", render_service.pages)
+track_cache("listings", render_service.listings)
+track_cache("category_counts", blog_service._category_counts)
+track_cache("bot_tokens", bot_service._tokens)
+track_cache("ai_responses", response_cache)
+track_cache("images", image_service)
+QUEUE_GAUGES = ("depth", "capacity", "workers", "busy")
+registry.callback(
+    "webhook_queue", "Telegram update queue occupancy", ("field",),
+    lambda: {(key,): value for key, value in update_queue.stats().items() if key in QUEUE_GAUGES}
+)
+registry.callback(
+    "webhook_updates_total", "Telegram updates by outcome", ("outcome",),
+    lambda: {(key,): value for key, value in update_queue.stats().items() if key not in QUEUE_GAUGES},
+    kind="counter"
+)
+registry.callback(
+    "telegram_send_queue", "Outbound Telegram send queue occupancy", ("field",),
+    lambda: {(key,): value for key, value in telegram_sender.queue.stats().items() if key in QUEUE_GAUGES}
+)
+registry.callback(
+    "telegram_replies_total", "Queued Telegram replies by outcome", ("outcome",),
+    lambda: {(key,): value for key, value in telegram_sender.stats().items()
+             if key in ("delivered", "undelivered", "rejected")},
+    kind="counter"
+)
+
+registry.callback(
+    "write_behind_depth", "Rows buffered for a batched insert", ("table",),
+    lambda: {(buffer.name,): buffer.depth for buffer in WRITE_BUFFERS}
+)
+registry.callback(
+    "write_behind_rows_total", "Buffered rows by outcome", ("table", "outcome"),
+    lambda: {(buffer.name, outcome): buffer.stats()[outcome] for buffer in WRITE_BUFFERS
+             for outcome in ("written", "ignored", "dropped")},
+    kind="counter"
+)
+registry.callback(
+    "write_behind_failed_batches_total", "Batched inserts that failed and were retried", ("table",),
+    lambda: {(buffer.name,): buffer.failed_batches for buffer in WRITE_BUFFERS},
+    kind="counter"
+)
+
+registry.callback(
+    "app_startup_seconds", "Time spent in each startup phase", ("phase",),
+    lambda: {(name,): seconds for name, seconds in startup_timer.phases.items()}
+)
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+registry.callback(
+    "llm_circuit_state", "AI provider circuit breaker state (0 closed, 1 half-open, 2 open)", ("provider",),
+    lambda: {(name,): CIRCUIT_STATES[breaker.state] for name, breaker in text_provider.breakers.items()}
+)
 
 @app.get("/")
 async def root():
@@ -31,7 +132,20 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow(),
+        "webhook_queue": update_queue.stats(),
+        "telegram_sends": telegram_sender.stats(),
+        "ai_providers": {name: breaker.state for name, breaker in text_provider.breakers.items()},
+        "response_cache": response_cache.stats(),
+        "write_behind": {buffer.name: buffer.stats() for buffer in WRITE_BUFFERS},
+        "startup": startup_timer.stats()
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 # Include routers
 app.include_router(blog_router, prefix="/blog", tags=["blogs"])
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+
+from app.cli import backfill_html, export_static, migrate, normalize_categories, pregenerate
+
+def main():
+    parser = argparse.ArgumentParser(description="Blog application management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Bring the database schema up to date with the models")
+    migrate_parser.add_argument("--force", action="store_true", help="Re-check every table even if the schema looks current")
+    migrate_parser.set_defaults(func=migrate.run)
+
+    backfill = subparsers.add_parser("backfill-html", help="Pre-render HTML for blogs stored without it")
+    backfill.add_argument("--batch-size", type=int, default=200)
+    backfill.set_defaults(func=backfill_html.run)
+
+    normalize = subparsers.add_parser("normalize-categories", help="Map stored categories onto the fixed category set")
+    normalize.add_argument("--dry-run", action="store_true", help="Only print the planned changes")
+    normalize.add_argument("--batch-size", type=int, default=500)
+    normalize.set_defaults(func=normalize_categories.run)
+
+    export = subparsers.add_parser("export-static", help="Render every blog and listing page to static HTML")
+    export.add_argument("--output", default="static_site")
+    export.add_argument("--templates", default="templates")
+    export.add_argument("--incremental", action="store_true", help="Only rewrite pages affected by new posts")
+    export.add_argument("--no-compress", action="store_true", help="Skip the .gz/.br siblings")
+    export.set_defaults(func=export_static.run)
+
+    pregen = subparsers.add_parser("pregenerate", help="Generate blogs in bulk from a topic list")
+    pregen.add_argument("file", nargs="?", default="-", help="File with one topic per line ('-' for stdin)")
+    pregen.add_argument("--concurrency", type=int, default=4, help="Generations in flight at once")
+    pregen.add_argument("--rate", type=float, default=1.0, help="Max generations started per second (0 = unlimited)")
+    pregen.add_argument("--batch-size", type=int, default=20, help="Rows per bulk INSERT")
+    pregen.add_argument("--checkpoint", default=".pregenerate-checkpoint.json")
+    pregen.set_defaults(func=pregenerate.run)
+
+    args = parser.parse_args()
+    asyncio.run(args.func(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -16,15 +16,38 @@ class Blog(Base):
     query = Column(String(255), unique=True, index=True, nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
+    html = Column(Text, nullable=True)  # content pre-rendered from markdown
     category = Column(String(100), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Serves category listings and keyset pagination without a filesort
+        Index("ix_blogs_category_created_at", "category", "created_at", "id"),
+    )
+
 class ImageUrl(Base):
     __tablename__ = "image_urls"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user = Column(String(255), nullable=False)
-    query = Column(String(255), nullable=False)
+    query = Column(String(255), nullable=False, index=True)  # normalized prompt
     link = Column(String(500), nullable=False)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the copy in the local image store
     chat_id = Column(Integer, nullable=False)
-    createdOn = Column(DateTime, default=func.now())
+    createdOn = Column(DateTime, default=datetime.utcnow)  # UTC, compared against IMAGE_LINK_TTL
+
+
+class ResponseCache(Base):
+    __tablename__ = "response_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(64), unique=True, nullable=False)  # sha256 of provider, model and normalized prompt
+    provider = Column(String(50), nullable=False)
+    model = Column(String(100), nullable=False)
+    prompt = Column(Text, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(String(64), nullable=False)  # fingerprint of the models the schema was last upgraded to
+    applied_at = Column(DateTime, default=datetime.utcnow)
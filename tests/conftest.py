@@ -0,0 +1,35 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so point the app at throwaway SQLite files first.
+# The replica is a separate file that nothing copies to, so tests see which one a read used.
+_directory = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_directory}/primary.db"
+os.environ["REPLICA_DATABASE_URL"] = f"sqlite+aiosqlite:///{_directory}/replica.db"
+
+from app.core.database import engine, lock_engine, read_engine, write_engine  # noqa: E402
+from models import Base  # noqa: E402
+
+@pytest.fixture
+def run():
+    """Run a coroutine against freshly created tables on the primary and replica, then drop them."""
+    def run(coro):
+        async def main():
+            for database in (engine, read_engine):
+                async with database.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+            try:
+                return await coro
+            finally:
+                for database in (engine, read_engine):
+                    async with database.begin() as conn:
+                        await conn.run_sync(Base.metadata.drop_all)
+                await engine.dispose()
+                await read_engine.dispose()
+                await lock_engine.dispose()
+                await write_engine.dispose()
+        return asyncio.run(main())
+    return run
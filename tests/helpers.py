@@ -0,0 +1,48 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.future import select
+
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.services.providers import TextProvider
+from models import Blog
+
+async def insert_blog(blog_id: int, query: str, html: Optional[str] = "", primary: bool = True,
+                      replica: bool = False) -> Blog:
+    """Commit a post directly, as another worker would, to the primary and/or the replica."""
+    values = dict(id=blog_id, query=query, title=query.title(), content=f"All about {query}", html=html,
+                  category="technology", created_at=datetime.utcnow())
+    for enabled, sessions in ((primary, SessionLocal), (replica, ReadSessionLocal)):
+        if enabled:
+            async with sessions() as db:
+                db.add(Blog(**values))
+                await db.commit()
+    return Blog(**values)
+
+async def find_blog(sessions, query: str) -> Optional[Blog]:
+    async with sessions() as db:
+        result = await db.execute(select(Blog).where(Blog.query == query))
+        return result.scalar_one_or_none()
+
+class StubProvider(TextProvider):
+    """Stand-in upstream that takes `delay` seconds for every completion and stream."""
+
+    name = "stub"
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(max_concurrency=8, timeout=30)
+        self.model = "stub-model"
+        self.delay = delay
+        self.in_flight = 0
+
+    async def _complete(self, prompt: str, max_tokens: int, temperature: float, json_mode: bool) -> str:
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return "technology" if max_tokens <= 10 else "# Stub Post\n\nGenerated by the stub."
+
+    async def _stream(self, prompt: str, max_tokens: int, temperature: float):
+        yield await self._complete(prompt, max_tokens, temperature, False)
@@ -0,0 +1,18 @@
+from app.services.category_classifier import CategoryClassifier
+
+def test_clear_title_is_classified():
+    classifier = CategoryClassifier(min_confidence=0.6)
+    category, confidence = classifier.classify("python docker kubernetes")
+    assert category == "tech" and confidence >= 0.9
+    assert classifier.predict("python docker kubernetes") == "tech"
+
+def test_single_keyword_in_an_ambiguous_title_goes_to_the_llm():
+    classifier = CategoryClassifier(min_confidence=0.6)
+    category, confidence = classifier.classify("python snake care")
+    assert category == "tech" and confidence < 0.6
+    assert classifier.predict("python snake care") is None
+
+def test_title_without_known_words_has_no_category():
+    classifier = CategoryClassifier(min_confidence=0.6)
+    assert classifier.classify("zorblax quuxification") == (None, 0.0)
+    assert classifier.predict("zorblax quuxification") is None
@@ -0,0 +1,42 @@
+import asyncio
+
+import httpx
+
+import main
+from app.api import blog_routes
+from app.services.blog_service import blog_writes
+from app.services.providers import FailoverProvider
+from tests.helpers import StubProvider, insert_blog
+
+GENERATION_SECONDS = 2.0
+
+def test_loop_keeps_serving_while_generations_are_in_flight(run, monkeypatch):
+    provider = StubProvider(delay=GENERATION_SECONDS)
+    monkeypatch.setattr(blog_routes.ai_service, "provider", FailoverProvider([provider]))
+
+    async def scenario():
+        await insert_blog(1, "existing post", replica=True)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            generations = [asyncio.create_task(client.get(f"/blog/post/slow topic {i}")) for i in range(4)]
+            while provider.in_flight < 4:
+                await asyncio.sleep(0.01)
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            health = await client.get("/health")
+            post = await client.get("/blog/post/existing post")
+            elapsed = loop.time() - started
+            still_generating = provider.in_flight
+
+            pages = await asyncio.gather(*generations)
+        await blog_routes.blog_service.drain(5)
+        await blog_writes.stop(5)
+        return health, post, elapsed, still_generating, pages
+
+    health, post, elapsed, still_generating, pages = run(scenario())
+    assert health.status_code == 200
+    assert post.status_code == 200
+    assert elapsed < GENERATION_SECONDS / 4
+    assert still_generating >= 4
+    assert all(page.status_code == 200 and "Generated by the stub." in page.text for page in pages)
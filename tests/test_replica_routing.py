@@ -0,0 +1,51 @@
+import httpx
+
+import main
+from app.api import blog_routes
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.services.blog_service import blog_writes
+from app.services.providers import FailoverProvider
+from tests.helpers import StubProvider, find_blog, insert_blog
+
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test", timeout=30)
+
+def test_listing_and_post_reads_come_from_the_replica(run):
+    async def scenario():
+        await insert_blog(31, "replica only post", html="<p>Served by the replica</p>", primary=False, replica=True)
+        async with client() as http:
+            home = await http.get("/blog/")
+            post = await http.get("/blog/post/replica only post")
+        return home, post
+
+    home, post = run(scenario())
+    assert home.status_code == 200 and "Replica Only Post" in home.text
+    assert post.status_code == 200 and "Served by the replica" in post.text
+
+def test_html_backfill_writes_to_the_primary(run):
+    async def scenario():
+        await insert_blog(32, "post without html", html=None, replica=True)
+        async with client() as http:
+            post = await http.get("/blog/post/post without html")
+        return post, await find_blog(SessionLocal, "post without html"), await find_blog(ReadSessionLocal, "post without html")
+
+    post, primary, replica = run(scenario())
+    assert post.status_code == 200
+    assert primary.html is not None and "All about post without html" in primary.html
+    assert replica.html is None
+
+def test_generated_posts_are_written_to_the_primary(run, monkeypatch):
+    monkeypatch.setattr(blog_routes.ai_service, "provider", FailoverProvider([StubProvider()]))
+
+    async def scenario():
+        async with client() as http:
+            post = await http.get("/blog/post/freshly generated topic")
+        await blog_routes.blog_service.drain(5)
+        await blog_writes.stop(5)
+        return (post, await find_blog(SessionLocal, "freshly generated topic"),
+                await find_blog(ReadSessionLocal, "freshly generated topic"))
+
+    post, primary, replica = run(scenario())
+    assert post.status_code == 200 and "Generated by the stub." in post.text
+    assert primary is not None and primary.title == "Stub Post"
+    assert replica is None
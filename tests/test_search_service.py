@@ -0,0 +1,26 @@
+from app.services.search_service import SearchIndex
+from tests.helpers import insert_blog
+
+def test_refresh_picks_up_lower_ids_inserted_after_a_local_add(run):
+    async def scenario():
+        index = SearchIndex()
+        await index.refresh()
+        # This worker created post 10; another worker then commits post 5
+        index.add_blog(await insert_blog(10, "rust ownership"))
+        await insert_blog(5, "python generators")
+        await index.refresh()
+        return {doc.query for doc, _ in index.search("generators")}
+
+    assert run(scenario()) == {"python generators"}
+
+def test_refresh_picks_up_lower_ids_committed_after_a_higher_one_was_read(run):
+    async def scenario():
+        index = SearchIndex()
+        await insert_blog(10, "rust ownership")
+        await index.refresh()
+        # Another worker's batch with a lower id commits late
+        await insert_blog(5, "python generators")
+        await index.refresh()
+        return index.loaded_id, {doc.query for doc, _ in index.search("generators")}
+
+    assert run(scenario()) == (10, {"python generators"})
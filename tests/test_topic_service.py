@@ -0,0 +1,57 @@
+import pytest
+
+from app.services.topic_service import TopicIndex
+from tests.helpers import insert_blog
+
+@pytest.fixture
+def index():
+    index = TopicIndex(threshold=0.7)
+    for query in ("world war 1 causes", "iphone 14 pro review", "python 3.11 new features", "is python slow",
+                  "python decorators", "kubernetes 1.29 autoscaling guide", "what to eat before a workout",
+                  "up and running with docker", "scaling out a postgres cluster"):
+        index.add(query)
+    return index
+
+@pytest.mark.parametrize("topic", [
+    "world war 2 causes",
+    "iphone 15 pro review",
+    "python 3.12 new features",
+    "python is not slow",
+    "what to eat after a workout",
+    "down and running with docker",
+    "scaling in a postgres cluster",
+])
+def test_different_numbers_negations_or_directions_do_not_match(index, topic):
+    assert index.match(topic) is None
+
+@pytest.mark.parametrize("topic, expected", [
+    ("Decorators in Python?", "python decorators"),
+    ("kubernets 1.29 autoscaling guide", "kubernetes 1.29 autoscaling guide"),
+    ("Is Python slow", "is python slow"),
+    ("What to eat before workouts?", "what to eat before a workout"),
+    ("Up and running with Docker", "up and running with docker"),
+])
+def test_rewordings_and_typos_match(index, topic, expected):
+    assert index.match(topic) == expected
+
+def test_refresh_picks_up_lower_ids_inserted_after_a_local_add(run):
+    async def scenario():
+        index = TopicIndex(threshold=0.7)
+        await index.refresh()
+        index.add_blog(await insert_blog(10, "rust ownership"))
+        await insert_blog(5, "python generators")
+        await index.refresh()
+        return index.match("Python generator")
+
+    assert run(scenario()) == "python generators"
+
+def test_refresh_picks_up_lower_ids_committed_after_a_higher_one_was_read(run):
+    async def scenario():
+        index = TopicIndex(threshold=0.7)
+        await insert_blog(10, "rust ownership")
+        await index.refresh()
+        await insert_blog(5, "python generators")
+        await index.refresh()
+        return index.loaded_id, index.match("Python generator")
+
+    assert run(scenario()) == (10, "python generators")